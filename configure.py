@@ -42,21 +42,26 @@ SPDX-License-Identifier: GPL-3.0-only
 __revision__ = "$Revision: 112153 $"
 
 import argparse
-import ctypes
+import atexit
+import collections
+import concurrent.futures
 import datetime
-import fnmatch
+import functools
 import glob
-import importlib;
+import hashlib
 import io
+import json
 import os
 import platform
 import re
-import shlex
 import shutil
+import stat
 import subprocess
 import sysconfig # Since Python 3.2.
 import sys
 import tempfile
+if sys.platform == 'win32':
+    import winreg
 
 g_sScriptPath = os.path.abspath(os.path.dirname(__file__));
 g_sScriptName = os.path.basename(__file__);
@@ -67,22 +72,49 @@ g_sDevBinPath = None; # Determined at runtime.
 class Log(io.TextIOBase):
     """
     Duplicates output to multiple file-like objects (used for logging and stdout).
+
+    Sinks with a real file descriptor are written via one writev(2) each,
+    skipping the per-sink TextIOWrapper codec and buffer machinery; sinks
+    without one (StringIO and the like) keep the plain Python path.
     """
     def __init__(self, *files):
         self.asFiles = files;
+        self.aiFds = [];
+        self.aoPyFiles = list(files);
+        if hasattr(os, 'writev'): # POSIX only.
+            self.aoPyFiles = [];
+            for f in files:
+                try:
+                    f.flush(); # Don't let earlier buffered data overtake our raw writes.
+                    self.aiFds.append(f.fileno());
+                except (OSError, ValueError, AttributeError):
+                    self.aoPyFiles.append(f);
+        # Hoisted for flush(): only buffered Python sinks ever need flushing,
+        # and filtering them on every flush call adds up over a whole run.
+        self.aoFlushables = [ f for f in self.aoPyFiles if hasattr(f, 'flush') ];
     def write(self, data):
         """
         Write data to all files.
         """
-        for f in self.asFiles:
+        if self.aiFds:
+            abData = data.encode('utf-8');
+            for fd in self.aiFds:
+                # writev may write short on pipes/ttys (signals, back-pressure
+                # from a pager); keep going until every byte is out.
+                cbWritten = os.writev(fd, [ abData ]);
+                while cbWritten < len(abData):
+                    cbWritten += os.writev(fd, [ abData[cbWritten:] ]);
+        for f in self.aoPyFiles:
             f.write(data);
     def flush(self):
         """
-        Flushes all files.
+        Flushes all files (the fd sinks are written unbuffered).
         """
-        for f in self.asFiles:
-            if not f.closed:
+        for f in self.aoFlushables:
+            try:
                 f.flush();
+            except ValueError:
+                pass; # Sink was closed under us; nothing left to flush then.
 
 class BuildArch:
     """
@@ -127,6 +159,7 @@ class BuildTarget:
 
 g_fDebug = True;              # Enables debug mode. Only for development.
 g_fContOnErr = False;         # Continue on fatal errors.
+g_fSlowProbes = False;        # Forces the split header/lib/compile probe stages. Only for debugging.
 g_fCompatMode = True;         # Enables compatibility mode to mimic the old build scripts. Enabled by default (for now).
 g_sEnvVarPrefix = 'VBOX_';
 g_sFileLog = 'configure.log'; # Log file path.
@@ -253,6 +286,92 @@ def isFile(sFile):
     printLog('Checking if file exists: ' + sFile);
     return os.path.isfile(sFile);
 
+def writeFileRaw(sFile, sContent):
+    """
+    Writes a small file using raw os.open/os.write/os.close.
+
+    Skips Python's text I/O stack (codec + buffered writer + line
+    translation), which is pure overhead for a few hundred bytes of
+    probe source.
+    """
+    fd = os.open(sFile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600);
+    try:
+        os.write(fd, sContent.encode('utf-8'));
+    finally:
+        os.close(fd);
+
+# Matches the timestamp comment line in the generated output files.
+g_oReGeneratedOn = re.compile(r'^(?:#|rem) Generated on .*$', re.MULTILINE);
+
+def writeFileIfChanged(sFilePath, sContent):
+    """
+    Writes sContent to sFilePath unless the file already holds the same
+    content apart from the 'Generated on' timestamp line.
+
+    Leaving an unchanged file alone keeps its mtime stable, so kmk doesn't
+    rebuild everything depending on it after a no-change configure run.  An
+    actual change goes through a temp file plus os.replace(), so readers
+    never see a half-written file.
+
+    Returns True if the file was (re)written, False if left untouched.
+    """
+    try:
+        with open(sFilePath, "r", encoding = "utf-8") as fh:
+            sOldContent = fh.read();
+        if g_oReGeneratedOn.sub('', sOldContent) == g_oReGeneratedOn.sub('', sContent):
+            printVerbose(1, f'{sFilePath} is unchanged -- keeping it (and its mtime) as-is');
+            return False;
+    except OSError:
+        pass; # No readable previous file -- write a fresh one.
+    sFileTmp = sFilePath + '.tmp';
+    with open(sFileTmp, "w", encoding = "utf-8") as fh:
+        fh.write(sContent);
+    os.replace(sFileTmp, sFilePath);
+    return True;
+
+def isRegularFile(sFile):
+    """
+    Checks if a path is an existing regular file.
+
+    Single os.stat, no logging -- for the search loops where isFile's
+    log line per candidate path would just be noise.
+    """
+    try:
+        return stat.S_ISREG(os.stat(sFile).st_mode);
+    except OSError:
+        return False;
+
+def isExecutableFile(sFile):
+    """
+    Checks if a path is a regular, executable file.
+
+    One os.stat answers both questions, instead of the usual
+    isfile + access pair (two metadata syscalls).
+    """
+    try:
+        oStat = os.stat(sFile);
+    except OSError:
+        return False;
+    return  stat.S_ISREG(oStat.st_mode) \
+        and (oStat.st_mode & 0o111) != 0;
+
+@functools.lru_cache(maxsize = 4096)
+def isDirCached(sDir):
+    """
+    Cached variant of os.path.isdir.
+
+    Used for the standard search directories, which otherwise get re-stat'd
+    by every single library check.
+    """
+    return os.path.isdir(sDir);
+
+@functools.lru_cache(maxsize = 4096)
+def pathExistsCached(sPath):
+    """
+    Cached variant of os.path.exists (see isDirCached).
+    """
+    return os.path.exists(sPath);
+
 def libraryFileStripSuffix(sLib):
     """
     Strips common static/dynamic library suffixes (UNIX, macOS, Windows) from a filename.
@@ -279,6 +398,7 @@ def libraryFileGetLinkerArg(sLib, fStripPath = False):
         sLibName = libraryFileStripSuffix(sLibName);
     return sLibName if not fStripPath else os.path.join(os.path.dirname(sLib), sLibName);
 
+@functools.lru_cache(maxsize = None)
 def getLinuxGnuTypeFromPlatform():
     """
     Returns the Linux GNU type based on the platform.
@@ -296,14 +416,271 @@ def getLinuxGnuTypeFromPlatform():
         "s390x": "s390x-linux-gnu",
         "riscv64": "riscv64-linux-gnu",
     };
-    return mapPlatform2GnuType.get(platform.machine().lower());
+    return mapPlatform2GnuType.get(g_sHostArch);
+
+class ProbeCache:
+    """
+    Persistent cache for probe results (autoconf config.cache style).
+
+    Stores the outcome of expensive compile/execute probes keyed by a hash of
+    everything which influences the result (search paths, code, compiler path
+    and mtime, target and architecture), so that repeated configure runs can
+    skip spawning the compiler altogether.
+    """
+    def __init__(self):
+        """
+        Constructor.
+        """
+        self.sFilePath = None;
+        self.fEnabled = True;
+        self.mapEntries = {};
+        self.fDirty = False;
+
+    def load(self, sFilePath):
+        """
+        Loads the cache file if it exists.
+
+        Returns success as boolean.
+        """
+        self.sFilePath = sFilePath;
+        if not self.fEnabled:
+            return False;
+        try:
+            with open(sFilePath, 'r', encoding = 'utf-8') as fh:
+                self.mapEntries = json.load(fh);
+            printVerbose(1, f"Loaded {len(self.mapEntries)} cached probe result(s) from '{sFilePath}'");
+            return True;
+        except (OSError, ValueError):
+            self.mapEntries = {};
+        return False;
+
+    @staticmethod
+    def calcKey(aKeyParts):
+        """
+        Returns the cache key (hex digest) for a list of values describing a probe.
+
+        Anything which influences the probe result (incl. mtimes for stale
+        entry invalidation) must be part of aKeyParts.
+        """
+        return hashlib.blake2b(json.dumps(aKeyParts, default = str).encode('utf-8')).hexdigest();
+
+    def get(self, sKey):
+        """
+        Returns the cached entry for a given key, or None if not cached (or caching is disabled).
+        """
+        if not self.fEnabled:
+            return None;
+        return self.mapEntries.get(sKey, None);
+
+    def set(self, sKey, aValue):
+        """
+        Stores an entry in the cache. Written out to disk lateron via flush().
+        """
+        if not self.fEnabled:
+            return;
+        self.mapEntries[sKey] = aValue;
+        self.fDirty = True;
+
+    def merge(self, mapEntries):
+        """
+        Merges entries (e.g. returned by a check worker process) into this cache.
+        """
+        if  not self.fEnabled \
+        or  not mapEntries:
+            return;
+        cBefore = len(self.mapEntries);
+        self.mapEntries.update(mapEntries);
+        if len(self.mapEntries) != cBefore:
+            self.fDirty = True;
+
+    def flush(self):
+        """
+        Writes the cache to disk atomically (temp file + os.replace).
+
+        Returns success as boolean.
+        """
+        if  not self.fEnabled \
+        or  not self.fDirty \
+        or  not self.sFilePath:
+            return True;
+        try:
+            os.makedirs(os.path.dirname(self.sFilePath), exist_ok = True);
+            sFileTmp = self.sFilePath + '.tmp';
+            with open(sFileTmp, 'w', encoding = 'utf-8') as fh:
+                json.dump(self.mapEntries, fh);
+            os.replace(sFileTmp, self.sFilePath);
+            self.fDirty = False;
+            return True;
+        except OSError as ex:
+            printVerbose(1, f"Failed to write probe cache to '{self.sFilePath}': {str(ex)}");
+        return False;
+
+# Global instance of the probe cache.
+# Gets loaded from / flushed to disk in main().
+g_oProbeCache = ProbeCache();
+
+def getPathMtimes(asPaths):
+    """
+    Returns the modification times for a list of paths (0 for non-existing ones).
+
+    Used for constructing probe cache keys.
+    """
+    aMtimes = [];
+    for sPath in asPaths:
+        try:
+            aMtimes.append(os.path.getmtime(sPath));
+        except OSError:
+            aMtimes.append(0);
+    return aMtimes;
+
+# Matches the version suffix of in-tree library directories (e.g. 'libpng-1.6.43').
+g_oReInTreeVer = re.compile(r'-([\d\.]+)$');
+
+@functools.lru_cache(maxsize = 1)
+def getWinRootDrives():
+    """
+    Returns a list of existing Windows root drives (e.g. [ 'C:', 'D:' ]).
+
+    Computed once, as probing all 24 drive letters costs a stat each and the
+    result is needed by every library check.
+    """
+    return [ sDrive + ":" for sDrive in "CDEFGHIJKLMNOPQRSTUVWXYZ" if os.path.exists(sDrive + ":") ];
+
+# Environment variables (and fallbacks) naming the Windows "Program Files" directories.
+g_asWinProgramFilesEnvVars = ( 'ProgramFiles',      r'C:\Program File',
+                               'ProgramFiles(x86)', r'C:\Program Files (x86)',
+                               'ProgramFiles(Arm)', r'C:\Program Files (Arm)' );
+
+@functools.lru_cache(maxsize = 1)
+def getWinProgramFilesPaths():
+    """
+    Returns a list of existing Windows "Program Files" directories.
+
+    Computed once -- each call otherwise re-reads six environment variables
+    and stats six candidate paths, and several tool checks ask for this.
+    The prepend/append overrides are fixed by argparse before any check runs.
+    """
+    asPaths = [ sPath for sPath in (os.environ.get(sEnv) for sEnv in g_asWinProgramFilesEnvVars) \
+                if sPath and pathExists(sPath) ];
+
+    return g_asPathsPrepend.get('programfiles', []) + asPaths + g_asPathsAppend.get('programfiles', []);
+
+# Directory names which never contain headers or libraries; pruned while scanning custom paths.
+g_asScanPruneDirs = frozenset([ '.git', '.svn', 'node_modules', 'share', 'doc', 'man' ]);
+
+@functools.lru_cache(maxsize = None)
+def findFileUnder(sRoot, sTarget):
+    """
+    Searches a directory tree breadth-first for a file with the given name.
+
+    Prunes directories which never contain headers or libraries and stops at
+    the first hit, unlike os.walk which stats every file in the tree.
+    Memoized, as several libraries may share the same custom path.
+
+    Returns the directory containing the first match, or None if not found.
+    """
+    aDirs = collections.deque([ sRoot ]);
+    while aDirs:
+        sDir = aDirs.popleft();
+        try:
+            with os.scandir(sDir) as oIter:
+                for oEntry in oIter:
+                    if  oEntry.name == sTarget \
+                    and oEntry.is_file():
+                        return sDir;
+                    if  oEntry.is_dir(follow_symlinks = False) \
+                    and oEntry.name not in g_asScanPruneDirs:
+                        aDirs.append(oEntry.path);
+        except OSError:
+            continue;
+    return None;
+
+def scanDirSorted(sDir, fWantDirs = True, fReverse = False):
+    """
+    Returns the full paths of all sub-directories (or files) of a directory,
+    sorted by name.
+
+    One scandir pass instead of glob + per-entry stat probes; the dir/file
+    filter reuses the stat data the directory read already provided.
+
+    Returns an empty list if the directory can't be read.
+    """
+    asPaths = [];
+    try:
+        with os.scandir(sDir) as oIter:
+            for oEntry in oIter:
+                if oEntry.is_dir() if fWantDirs else oEntry.is_file():
+                    asPaths.append(oEntry.path);
+    except OSError:
+        return [];
+    asPaths.sort(reverse = fReverse);
+    return asPaths;
+
+# Upper bound for how much captured probe/tool output we bother decoding.
+g_cbMaxProbeOutput = 16384;
+
+def firstLineOf(abBuf):
+    """
+    Returns the first non-empty line of a bytes buffer as a decoded string,
+    or an empty string for no (usable) output.
+
+    Only decodes the line actually needed instead of the whole buffer.
+    """
+    if not abBuf:
+        return '';
+    offStart = 0;
+    while offStart < len(abBuf):
+        offEnd = abBuf.find(b'\n', offStart);
+        if offEnd < 0:
+            offEnd = len(abBuf);
+        sLine = abBuf[offStart:offEnd].decode('utf-8', 'replace').strip();
+        if sLine:
+            return sLine;
+        offStart = offEnd + 1;
+    return '';
+
+# Python modules configure requires to be installed (immutable on purpose).
+g_asRequiredPyModules = ( 'packaging', );
+
+# Known version switches for common tools.  Each switch tried by checkWhich is
+# a full subprocess, so knowing the right one up front avoids spawning a tool
+# up to seven times just to learn it doesn't grok '--version'.
+g_mapVersionSwitches = {
+    'brew':             '--version',
+    'cc':               '--version',
+    'clang':            '--version',
+    'clang++':          '--version',
+    'g++':              '--version',
+    'gcc':              '--version',
+    'glslangValidator': '-v',
+    'gmake':            '--version',
+    'java':             '-version',
+    'javac':            '-version',
+    'make':             '--version',
+    'makeself':         '--version',
+    'nasm':             '-v',
+    'pkg-config':       '--version',
+    'xsltproc':         '--version',
+    'yasm':             '--version',
+};
 
 def checkWhich(sCmdName, sToolDesc = None, sCustomPath = None, asVersionSwitches = None):
     """
     Helper to check for a command in PATH or custom path.
 
+    Results are memoized (and persisted via the probe cache), as the same
+    command often is checked by multiple tools.
+
     Returns a tuple of (command path, version string) or (None, None) if not found.
     """
+    _ = sToolDesc; # Only descriptive; deliberately kept out of the memoization key.
+    return _checkWhichCached(sCmdName, sCustomPath, tuple(asVersionSwitches) if asVersionSwitches else None);
+
+@functools.lru_cache(maxsize = None)
+def _checkWhichCached(sCmdName, sCustomPath, asVersionSwitches):
+    """
+    Worker for checkWhich. Takes the version switches as a (hashable) tuple.
+    """
 
     sExeSuff = ".exe" if g_enmHostTarget == BuildTarget.WINDOWS else "";
     if not sCmdName.endswith(sExeSuff):
@@ -311,10 +688,23 @@ def checkWhich(sCmdName, sToolDesc = None, sCustomPath = None, asVersionSwitches
 
     printVerbose(1, f"Checking which '{sCmdName}' ...");
 
+    # Consult the persistent probe cache so repeat configures skip the version subprocess.
+    # Entries are validated against the resolved binary's mtime before use.
+    sCacheKey = ProbeCache.calcKey([ 'which', sCmdName, sCustomPath, asVersionSwitches, os.environ.get('PATH', '') ]);
+    aCached = g_oProbeCache.get(sCacheKey);
+    if aCached is not None:
+        sCmdPathCached, sVerCached, fMtime = aCached;
+        try:
+            if os.path.getmtime(sCmdPathCached) == fMtime:
+                printVerbose(1, f"Using cached result for '{sCmdName}': {sCmdPathCached}");
+                return sCmdPathCached, sVerCached;
+        except OSError:
+            pass; # Binary changed or vanished -- re-probe.
+
     sCmdPath = None;
     if sCustomPath:
         sCmdPath = os.path.join(sCustomPath, sCmdName);
-        if isFile(sCmdPath) and os.access(sCmdPath, os.X_OK):
+        if isExecutableFile(sCmdPath):
             printVerbose(1, f"Found '{sCmdName}' at custom path: {sCmdPath}");
         else:
             printError(f"'{sCmdName}' not found at custom path: {sCmdPath}");
@@ -327,20 +717,28 @@ def checkWhich(sCmdName, sToolDesc = None, sCustomPath = None, asVersionSwitches
     # Try to get version.
     if sCmdPath:
         if not asVersionSwitches:
-            asVersionSwitches = [ '--version', '-V', '/?', '/h', '/help', '-version', 'version' ];
+            sKnownSwitch = g_mapVersionSwitches.get(sCmdName[:-len(sExeSuff)] if sExeSuff else sCmdName);
+            if sKnownSwitch:
+                asVersionSwitches = [ sKnownSwitch ];
+            else: # Unknown tool -- fall back to trying the usual suspects.
+                asVersionSwitches = [ '--version', '-V', '/?', '/h', '/help', '-version', 'version' ];
         try:
             for sSwitch in asVersionSwitches:
                 oProc = subprocess.run([sCmdPath, sSwitch], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False, timeout=10);
                 if oProc.returncode == 0:
-                    try:
-                        sVer = oProc.stdout.decode('utf-8', 'replace').strip().splitlines()[0];
-                    except: # Some programs (java, for instance) output their version info in stderr.
-                        sVer = oProc.stderr.decode('utf-8', 'replace').strip().splitlines()[0];
+                    # Only the first line is interesting; don't decode kilobytes of version blurb.
+                    sVer = firstLineOf(oProc.stdout[:g_cbMaxProbeOutput]);
+                    if not sVer: # Some programs (java, for instance) output their version info in stderr.
+                        sVer = firstLineOf(oProc.stderr[:g_cbMaxProbeOutput]);
+                    if not sVer:
+                        sVer = '<unknown>';
                     printVerbose(1, f"Detected version for '{sCmdName}' is: {sVer}");
+                    g_oProbeCache.set(sCacheKey, [ sCmdPath, sVer, os.path.getmtime(sCmdPath) ]);
                     return sCmdPath, sVer;
+            g_oProbeCache.set(sCacheKey, [ sCmdPath, '<unknown>', os.path.getmtime(sCmdPath) ]);
             return sCmdPath, '<unknown>';
         except subprocess.SubprocessError as ex:
-            printError(f"Error while checking version of {sToolDesc if sToolDesc else sCmdName}: {str(ex)}");
+            printError(f"Error while checking version of {sCmdName}: {str(ex)}");
         return None, None;
 
     printVerbose(1, f"'{sCmdName}' not found in PATH.");
@@ -372,23 +770,60 @@ def getLinkerArgs(enmBuildTarget, asLibFiles):
             asLibArgs += [ f'-l{sLibCur}' ];
     return asLibArgs;
 
+# Markers hinting that a header requires C++ to compile.
+g_asCPPHeaderMarkers = frozenset([ 'c++', 'iostream', 'Qt', 'qt', 'qglobal.h', 'qcoreapplication.h' ]);
+
 def hasCPPHeader(asHeader):
     """
     Rough guess which headers require C++.
 
     Returns True if it requires C++, False if C only.
     """
-    if len(asHeader) == 0:
+    if not asHeader:
         return False; # ASSUME C on empty headers.
-    asCPPHdr = [ 'c++', 'iostream', 'Qt', 'qt', 'qglobal.h', 'qcoreapplication.h' ];
-    if asHeader:
-        asCPPHdr.extend(asHeader);
-    return any(h for h in asCPPHdr if h and any(c in h for c in asCPPHdr));
+    return any(sMarker in sHdr for sHdr in asHeader if sHdr for sMarker in g_asCPPHeaderMarkers);
+
+@functools.lru_cache(maxsize = 1)
+def getCompilerCacheTool():
+    """
+    Returns the path to ccache (or sccache) if installed, None otherwise.
+
+    Probe compiles are tiny and rarely change between configure runs, which
+    is exactly the workload these caches excel at. Set VBOX_NO_CCACHE in the
+    environment to opt out.
+    """
+    if os.environ.get('VBOX_NO_CCACHE'):
+        return None;
+    for sTool in ( 'ccache', 'sccache' ):
+        sPath = shutil.which(sTool);
+        if sPath:
+            printVerbose(1, f"Using compiler cache '{sPath}' for probe compiles");
+            return sPath;
+    return None;
+
+# Shared temp directory for probe sources and binaries. Created on first use.
+g_sProbeDir = None;
+
+def getProbeDir():
+    """
+    Returns the shared temp directory for probe sources and binaries,
+    creating it on first use.
+
+    The directory is removed at exit, except in debug mode where the files
+    are kept around for inspection.
+    """
+    global g_sProbeDir;
+    if g_sProbeDir is None:
+        g_sProbeDir = tempfile.mkdtemp(prefix = 'vbox-cfg-');
+        if not g_fDebug:
+            atexit.register(shutil.rmtree, g_sProbeDir, ignore_errors = True);
+    return g_sProbeDir;
 
 def getWinError(uCode):
     """
     Returns an error string for a given Windows error code.
     """
+    import ctypes; # Only needed (and fully functional) on Windows; don't tax startup elsewhere.
     FORMAT_MESSAGE_FROM_SYSTEM    = 0x00001000;
     FORMAT_MESSAGE_IGNORE_INSERTS = 0x00000200;
 
@@ -417,24 +852,39 @@ def compileAndExecute(sName, enmBuildTarget, enmBuildArch, asIncPaths, asLibPath
         sCompiler = g_oEnv['config_cpp_compiler'] if hasCPPHeader(asIncFiles) else g_oEnv['config_c_compiler'];
     assert sCompiler is not None;
 
-    if g_fDebug:
-        sTempDir = tempfile.gettempdir();
-    else:
-        sTempDir = tempfile.mkdtemp();
-
-    asFilesToDelete = []; # For cleanup
-
-    sFileSource = os.path.join(sTempDir, "testlib.cpp" if ('g++' in sCompiler or 'cl.exe' in sCompiler) else "testlib.c"); ## @todo Improve this.
-    asFilesToDelete.extend( [sFileSource] );
-    sFileImage  = os.path.join(sTempDir, "a.out" if enmBuildTarget != BuildTarget.WINDOWS else "a.exe");
-    asFilesToDelete.extend( [sFileImage] );
-
-    with open(sFileSource, "w", encoding = 'utf-8') as fh:
-        fh.write(sCode);
-    fh.close();
+    # Check the probe cache first. The compiler mtime is part of the key, so a
+    # changed compiler automatically invalidates stale entries.
+    try:
+        sCacheKey = ProbeCache.calcKey([ sName, asIncPaths, asLibPaths, asIncFiles, asLibFiles, sCode, \
+                                         sCompiler, os.path.getmtime(sCompiler), enmBuildTarget, enmBuildArch, \
+                                         asLinkerFlags, asDefines ]);
+    except OSError:
+        sCacheKey = None; # Can't stat the compiler; don't cache.
+    if sCacheKey:
+        aCached = g_oProbeCache.get(sCacheKey);
+        if aCached is not None:
+            printVerbose(1, f"Using cached probe result for {sName}");
+            return tuple(aCached);
+
+    sTempDir = getProbeDir();
+
+    # Content-address the probe by everything which influences the build, so
+    # identical probes later in the run reuse the already-built binary.
+    sProbeKey = hashlib.sha1(json.dumps([ sCode, sCompiler, asIncPaths, asLibPaths, asLibFiles, \
+                                          asLinkerFlags, asDefines ], default = str).encode('utf-8')).hexdigest()[:16];
+    sFileSource = os.path.join(sTempDir, sProbeKey + (".cpp" if ('g++' in sCompiler or 'cl.exe' in sCompiler) else ".c")); ## @todo Improve this.
+    sFileImage  = os.path.join(sTempDir, sProbeKey + (".out" if enmBuildTarget != BuildTarget.WINDOWS else ".exe"));
 
     asCmd = [ sCompiler ];
-    oProcEnv = oEnv if oEnv else g_oEnv;
+    if enmBuildTarget != BuildTarget.WINDOWS: # ccache doesn't grok cl.exe command lines.
+        sCcache = getCompilerCacheTool();
+        if sCcache:
+            asCmd = [ sCcache ] + asCmd;
+    # Apply the per-probe INCLUDE/LIB/PATH deltas to a scratch copy; mutating
+    # the shared environment would grow it by another segment on every probe
+    # (and on Windows each probe would pay the env conversion cost again).
+    oProcEnv = EnvManager();
+    oProcEnv.env = dict((oEnv if oEnv else g_oEnv).env);
     if g_fDebug:
         if enmBuildTarget == BuildTarget.WINDOWS:
             asCmd.extend( [ '/showIncludes' ]);
@@ -473,25 +923,33 @@ def compileAndExecute(sName, enmBuildTarget, enmBuildArch, asIncPaths, asLibPath
     try:
         # Add the compiler's path to PATH.
         oProcEnv.prependPath('PATH', os.path.dirname(sCompiler));
-        # Try compiling the test source file.
-        oProc = subprocess.run(asCmd, env = oProcEnv.env, stdout = subprocess.PIPE, stderr = subprocess.PIPE, check = False, timeout = 15);
-        if oProc.returncode != 0:
-            sStdOut = oProc.stdout.decode("utf-8", errors="ignore"); # MSVC prints errors to stdout.
-            sStdErr = oProc.stderr.decode("utf-8", errors="ignore");
-            if fLog:
-                printError(f'Compilation of test program for {sName} failed:');
-                printLog  (f'    { " ".join(asCmd) }');
-                printLog  (sStdOut);
-                printLog  (sStdErr);
+        fCompiled = True;
+        if os.path.isfile(sFileImage):
+            # An identical probe was built earlier this run -- reuse the binary.
+            printVerbose(1, f"Reusing already built probe binary for {sName}");
         else:
+            writeFileRaw(sFileSource, sCode);
+            # Try compiling the test source file.
+            oProc = subprocess.run(asCmd, env = oProcEnv.env, stdout = subprocess.PIPE, stderr = subprocess.PIPE, check = False, timeout = 15);
+            if oProc.returncode != 0:
+                fCompiled = False;
+                # Cap what we decode/log; compilers can dump way more than anybody reads.
+                sStdOut = oProc.stdout[:g_cbMaxProbeOutput].decode("utf-8", errors="ignore"); # MSVC prints errors to stdout.
+                sStdErr = oProc.stderr[:g_cbMaxProbeOutput].decode("utf-8", errors="ignore");
+                if fLog:
+                    printError(f'Compilation of test program for {sName} failed:');
+                    printLog  (f'    { " ".join(asCmd) }');
+                    printLog  (sStdOut);
+                    printLog  (sStdErr);
+        if fCompiled:
             # Try executing the compiled binary and capture stdout + stderr.
             try:
-                oProc = subprocess.run([sFileImage], env = oProcEnv.env, shell = True, stdout = subprocess.PIPE, stderr = subprocess.PIPE, check = False, timeout = 10);
+                oProc = subprocess.run([sFileImage], env = oProcEnv.env, stdout = subprocess.PIPE, stderr = subprocess.PIPE, check = False, timeout = 10);
                 if oProc.returncode == 0:
-                    sStdOut = oProc.stdout.decode('utf-8', 'replace').strip();
+                    sStdOut = oProc.stdout[:g_cbMaxProbeOutput].decode('utf-8', 'replace').strip();
                     fRet = True;
                 else:
-                    sStdErr = oProc.stderr.decode("utf-8", errors="ignore");
+                    sStdErr = oProc.stderr[:g_cbMaxProbeOutput].decode("utf-8", errors="ignore");
                     if fLog:
                         printError(f"Execution of test binary for {sName} failed with return code {oProc.returncode}:");
                         if enmBuildTarget == BuildTarget.WINDOWS:
@@ -513,33 +971,90 @@ def compileAndExecute(sName, enmBuildTarget, enmBuildArch, asIncPaths, asLibPath
         printError(f'    { " ".join(asCmd) }', fDontCount = True);
         printError(str(e));
 
-    # Clean up.
-    try:
-        if not g_fDebug:
-            for sFileToDel in asFilesToDelete:
-                try:
-                    os.remove(sFileToDel);
-                except PermissionError:
-                    pass;
-            os.rmdir(sTempDir);
-    except OSError as ex:
-        if fLog:
-            printVerbose(1, f"Failed to remove temporary files in '{sTempDir}': {str(ex)}");
+    # Note: No per-probe cleanup here; the whole probe directory is removed at exit.
+
+    if sCacheKey:
+        g_oProbeCache.set(sCacheKey, [ fRet, sStdOut, sStdErr ]);
 
     return fRet, sStdOut, sStdErr;
 
+# Matches the marker + version string literal(s) in preprocessed version probe
+# output; stringized numeric macros come out as a run of adjacent literals
+# which the C compiler (and getVersionFromMatch) would concatenate.
+g_oReVerMacro = re.compile(r'"@@VBOX_VER@@"((?:\s*"[^"]*")+)');
+
+def getVersionFromMatch(sLiterals):
+    """
+    Concatenates the adjacent string literals matched by g_oReVerMacro.
+    """
+    return ''.join(re.findall(r'"([^"]*)"', sLiterals));
+
+def preprocessVersionMacro(sName, sHeader, sVersionMacro, asIncPaths):
+    """
+    Runs the preprocessor over a minimal test program referencing a version
+    macro and extracts its value from the output.
+
+    sVersionMacro is either the name of a string macro, or a tuple of numeric
+    macro names which are stringized and joined with dots (the usual
+    MAJOR/MINOR/MICRO triple).  Note that the macros are fully expanded by the
+    preprocessor here, unlike what a -dM macro dump would report.
+
+    This avoids the link and execute stages of a full probe, which also works
+    for cross-builds where running the test binary isn't possible.
+
+    Returns the version string, or None on any failure (the caller then falls
+    back to the full compile probe).
+    """
+    if g_enmHostTarget == BuildTarget.WINDOWS:
+        return None; # Not worth parsing cl.exe /E output here.
+    fCPP = hasCPPHeader([ sHeader ]);
+    sCompiler = g_oEnv['config_cpp_compiler'] if fCPP else g_oEnv['config_c_compiler'];
+    if not sCompiler:
+        return None;
+    if isinstance(sVersionMacro, tuple):
+        sExpr = ' "." '.join(f'VBOX_CFG_XSTR({sMacro})' for sMacro in sVersionMacro);
+        sCode = f'#include <{sHeader}>\n' \
+                '#define VBOX_CFG_STR(x) #x\n#define VBOX_CFG_XSTR(x) VBOX_CFG_STR(x)\n' \
+                f'const char *g_szVBoxCfgVer = "@@VBOX_VER@@" {sExpr};\n';
+    else:
+        sCode = f'#include <{sHeader}>\nconst char *g_szVBoxCfgVer = "@@VBOX_VER@@" {sVersionMacro};\n';
+    sFileSource = os.path.join(getProbeDir(), \
+                               hashlib.sha1(sCode.encode('utf-8')).hexdigest()[:16] + ('.cpp' if fCPP else '.c'));
+    try:
+        writeFileRaw(sFileSource, sCode);
+        # -P keeps linemarkers out of the output; they'd land between the
+        # marker and the expanded literal and break the regex match.
+        asCmd = [ sCompiler, '-E', '-P' ] + [ f'-I{sIncPath}' for sIncPath in asIncPaths ] + [ sFileSource ];
+        oProc = subprocess.run(asCmd, stdout = subprocess.PIPE, stderr = subprocess.PIPE, check = False, timeout = 15);
+    except (OSError, subprocess.SubprocessError) as ex:
+        printVerbose(1, f'{sName}: Preprocessor probe failed: {str(ex)}');
+        return None;
+    if oProc.returncode != 0:
+        return None;
+    oMatch = g_oReVerMacro.search(oProc.stdout.decode('utf-8', 'replace'));
+    if oMatch:
+        sVer = getVersionFromMatch(oMatch.group(1));
+        printVerbose(1, f"{sName}: Detected version (via preprocessor): {sVer}");
+        return sVer;
+    return None; # Macro didn't expand to string literals -- let the full probe handle it.
+
+@functools.lru_cache(maxsize = None)
 def getPackageLibs(sPackageName):
     """
     Returns a tuple (success, list) of libraries of a given package.
+
+    Memoized, as the same package may be queried by multiple checks and
+    each query shells out to pkg-config.
     """
+    import shlex; # Only needed for parsing pkg-config output.
     try:
         #
         # Linux, Solaris and macOS
         #
         if g_enmHostTarget in [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.DARWIN ]:
             # Use pkg-config on Linux and macOS.
-            sCmd = f"pkg-config --libs {shlex.quote(sPackageName)}"
-            oProc = subprocess.run(sCmd, shell = True, check = True, stdout = subprocess.PIPE, stderr = subprocess.PIPE, text =True);
+            # Note: No shell=True here -- that would fork a shell just to exec pkg-config.
+            oProc = subprocess.run([ 'pkg-config', '--libs', sPackageName ], check = True, stdout = subprocess.PIPE, stderr = subprocess.PIPE, text =True);
             if oProc \
             and oProc.returncode == 0:
                 asArg = shlex.split(oProc.stdout.strip());
@@ -589,23 +1104,27 @@ def getPackageLibs(sPackageName):
                 print(f"Found libraries for package '{sPackageName}' in vcpkg: {libs}");
         else:
             raise RuntimeError('Unsupported OS');
-    except subprocess.CalledProcessError:
+    except (subprocess.CalledProcessError, FileNotFoundError): # The latter if pkg-config itself is missing.
         printVerbose(1, f'Package "{sPackageName}" invalid or not found');
     return False, None;
 
+@functools.lru_cache(maxsize = None)
 def getPackagePath(sPackageName):
     """
     Returns the package path for a given package.
+
+    Memoized for the same reason as getPackageLibs.
     """
     try:
         if g_enmHostTarget in [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.DARWIN ]:
             # Use pkg-config on Linux and Solaris.
             # On Darwin we ask pkg-config first, then try brew down below.
-            sCmd = f"pkg-config --variable=exec_prefix {shlex.quote(sPackageName)}"
+            asCmd = [ 'pkg-config', '--variable=exec_prefix', sPackageName ];
         elif g_enmHostTarget == BuildTarget.WINDOWS:
             # Detect VCPKG.
             # See: https://learn.microsoft.com/en-us/vcpkg/ + https://vcpkg.io
             sCmd, _ = checkWhich('vcpkg');
+            asCmd = [ sCmd ] if sCmd else None;
             if sCmd:
                 sVcPkgRoot = g_oEnv.get('config_vcpkg_root', os.environ['VCPKG_ROOT'] if 'VCPKG_ROOT' in os.environ else None);
                 if sVcPkgRoot:
@@ -616,21 +1135,20 @@ def getPackagePath(sPackageName):
         else:
             raise RuntimeError('Unsupported OS');
 
-        if sCmd:
-            oProc = subprocess.run(sCmd, shell = True, check = False, stdout = subprocess.PIPE, stderr = subprocess.PIPE, text =True);
+        if asCmd:
+            oProc = subprocess.run(asCmd, check = False, stdout = subprocess.PIPE, stderr = subprocess.PIPE, text =True);
             if oProc.returncode == 0 and oProc.stdout.strip():
                 sPath = oProc.stdout.strip();
                 return True, sPath;
 
         # If pkg-config fails on Darwin, try asking brew instead.
         if BuildTarget.DARWIN:
-            sCmd = f'brew --prefix {sPackageName}';
-            oProc = subprocess.run(sCmd, shell = True, check = False, stdout = subprocess.PIPE, stderr = subprocess.PIPE, text =True);
+            oProc = subprocess.run([ 'brew', '--prefix', sPackageName ], check = False, stdout = subprocess.PIPE, stderr = subprocess.PIPE, text =True);
             if oProc.returncode == 0 and oProc.stdout.strip():
                 sPath = oProc.stdout.strip();
                 return True, sPath;
 
-    except subprocess.CalledProcessError as ex:
+    except (subprocess.CalledProcessError, FileNotFoundError) as ex: # The latter if pkg-config/brew itself is missing.
         printVerbose(1, f'Package "{sPackageName}" invalid or not found: {ex}');
     return False, None;
 
@@ -678,7 +1196,12 @@ class LibraryCheck(CheckBase):
     """
     Describes and checks for a library / package.
     """
-    def __init__(self, sName, asIncFiles, asLibFiles, aeTargets, sCode, fnCallback = None, aeTargetsExcluded = None, asAltIncFiles = None):
+    # Directories which turned out to be unscannable (vanished, permissions).
+    # Shared across all instances, so later libraries skip them right away.
+    s_asUnscannableDirs = set();
+
+    def __init__(self, sName, asIncFiles, asLibFiles, aeTargets, sCode, fnCallback = None, aeTargetsExcluded = None, asAltIncFiles = None, \
+                 sVersionMacro = None, sPkgConfigName = None):
         """
         Constructor.
         """
@@ -687,6 +1210,17 @@ class LibraryCheck(CheckBase):
         self.asIncFiles = asIncFiles or [];
         self.asLibFiles = asLibFiles or [];
         self.sCode = sCode;
+        # Base of the VBOX_WITH_/SDK_ variable names derived from sName;
+        # computed once here rather than per AutoConfig.kmk write.
+        self.sVarBase = sName.upper().replace("+", "PLUS").replace("-", "_");
+        # Name of a version macro (string literal) in the main header, or a
+        # tuple of numeric macro names joined with dots, if known.  Allows
+        # detecting the version with a preprocessor-only probe.
+        self.sVersionMacro = sVersionMacro;
+        # Name of the library's pkg-config module (.pc file), if it ships one.
+        self.sPkgConfigName = sPkgConfigName;
+        # Version reported by the bulk pkg-config query in main(), if any.
+        self.sPkgConfigVer = None;
         self.fnCallback = fnCallback;
         self.aeTargets = aeTargets;
         self.aeTargetsExcluded = aeTargetsExcluded if aeTargetsExcluded else [];
@@ -705,14 +1239,29 @@ class LibraryCheck(CheckBase):
         self.asDefines = [];
         # Is a tri-state: None if not required (optional or not needed), False if required but not found, True if found.
         self.fHave = None;
+        # Tri-state result of the batched syntax pre-pass: None if it didn't
+        # run, False if this probe failed to compile there (saves trying the
+        # combined compile probe again), True if it compiled.
+        self.fBatchSyntaxOk = None;
         # Contains the (parsable) version string if detected.
         # Only valid if self.fHave is True.
         self.sVer = None;
+        # Assembled lazily by getTestCode; the batched pre-pass, the combined
+        # probe and the split stages all ask for the same source.
+        self.sTestCode = None;
 
     def getTestCode(self):
         """
         Return minimal program *with version print* for header check, per-library logic.
         """
+        if self.sTestCode is None:
+            self.sTestCode = self.buildTestCode();
+        return self.sTestCode;
+
+    def buildTestCode(self):
+        """
+        Assembles the probe source for getTestCode.
+        """
         header = self.asIncFiles or (self.asAltIncFiles[0] if self.asAltIncFiles else None);
         if not header:
             return "";
@@ -740,12 +1289,76 @@ class LibraryCheck(CheckBase):
             self.sVer = sStdOut;
         return fRc, sStdOut, sStdErr;
 
+    def probeVersionMacro(self):
+        """
+        Attempts to determine the library version by preprocessing its main
+        header and extracting self.sVersionMacro -- no link and no test binary
+        execution needed.
+
+        Returns the version string, or None if header or macro weren't found.
+        """
+        if  not self.sVersionMacro \
+        or  not self.asIncFiles:
+            return None;
+        asIncPaths = list(dict.fromkeys(self.asIncPaths + self.getIncSearchPaths()));
+        sVer = preprocessVersionMacro(self.sName, self.asIncFiles[0], self.sVersionMacro, asIncPaths);
+        if sVer is not None:
+            # As in probeAll: record where the headers actually resolve from,
+            # not the whole search list.
+            asHitIncPaths = self.probeHeadersBatch(self.asIncFiles, asIncPaths);
+            if asHitIncPaths:
+                self.asIncPaths = asHitIncPaths;
+        return sVer;
+
+    def probeAll(self):
+        """
+        Answers the header, library and compile questions with a single
+        compiler invocation instead of the separate checkInc/checkLib stages.
+
+        All standard search paths are handed to the compiler as include and
+        library paths; its error stream tells us what (if anything) is missing.
+
+        Returns True if the probe compiled and executed successfully, False
+        otherwise (the caller then falls back to the split stages).
+        """
+        asIncPaths = list(dict.fromkeys(self.asIncPaths + self.getIncSearchPaths()));
+        asLibPaths = list(dict.fromkeys(self.asLibPaths + self.getLibSearchPaths()));
+        fRc, sStdOut, sStdErr = compileAndExecute(self.sName, g_oEnv['KBUILD_TARGET'], g_oEnv['KBUILD_TARGET_ARCH'], \
+                                                  asIncPaths, asLibPaths, self.asIncFiles, self.asLibFiles, \
+                                                  self.getTestCode(), asLinkerFlags = self.asLinkerFlags, \
+                                                  asDefines = self.asDefines, fLog = False);
+        if fRc:
+            if sStdOut:
+                self.sVer = sStdOut;
+            # Record only the directories the headers/libraries actually
+            # resolve from -- downstream (summary table, SDK_*_INCS/_LIBS)
+            # treats element 0 as the find location, so assigning the whole
+            # search lists would name the first standard directory instead.
+            if self.asIncFiles:
+                asHitIncPaths = self.probeHeadersBatch(self.asIncFiles, asIncPaths);
+                if asHitIncPaths:
+                    self.asIncPaths = asHitIncPaths;
+            if  self.asLibFiles \
+            and not self.checkLib(fLog = False):
+                # Linked fine but the file isn't in the scan list (linker
+                # default path); leave the lib paths for the summary as-is.
+                self.printVerbose(1, 'Combined probe: library location not identified');
+            return True;
+        # Show what the compiler/linker complained about (missing header vs. missing lib).
+        for sLine in (sStdErr or '').splitlines():
+            if  'No such file' in sLine \
+            or  'cannot find' in sLine:
+                self.printVerbose(1, f'Combined probe: {sLine}');
+        return False;
+
     def setArgs(self, args):
         """
         Applies argparse options for disabling and custom paths.
         """
-        self.fDisabled = getattr(args, f'config_libs_disable_{self.sName.replace("-", "_")}', False);
-        self.sCustomPath = getattr(args, f'config_libs_path_{self.sName.replace("-", "_")}', None);
+        mapArgs = vars(args); # Plain dict lookups instead of getattr reflection.
+        sLibName = self.sName.replace("-", "_");
+        self.fDisabled = mapArgs.get(f'config_libs_disable_{sLibName}', False);
+        self.sCustomPath = mapArgs.get(f'config_libs_path_{sLibName}');
 
     def getIncSearchPaths(self):
         """
@@ -771,8 +1384,7 @@ class LibraryCheck(CheckBase):
             #
             # Desperate fallback.
             #
-            asRootDrivers = [ d+":" for d in "CDEFGHIJKLMNOPQRSTUVWXYZ" if pathExists(d+":") ];
-            for r in asRootDrivers:
+            for r in getWinRootDrives():
                 asPaths.extend([ os.path.join(r, p) for p in [
                     "\\msys64\\mingw64\\include", "\\msys64\\mingw32\\include", "\\include" ]]);
                 asPaths.extend([ r"c:\\Program Files", r"c:\\Program Files (x86)" ]);
@@ -796,20 +1408,21 @@ class LibraryCheck(CheckBase):
                              "/opt/include", "/opt/local/include" ]);
 
         #
-        # Walk the custom path to guess where the include files are.
+        # Scan the custom path to guess where the include files are.
         #
         if self.sCustomPath:
             for sIncFile in self.asIncFiles:
-                for sRoot, _, asFiles in os.walk(self.sCustomPath):
-                    if sIncFile in asFiles:
-                        asPaths = [ sRoot ] + asPaths;
+                sDir = findFileUnder(self.sCustomPath, sIncFile);
+                if sDir:
+                    asPaths = [ sDir ] + asPaths;
 
         #
         # Some libs need IPRT, so include it.
         #
         asPaths.extend([ os.path.join(g_sScriptPath, 'include') ]);
 
-        return [p for p in asPaths if isDir(p)];
+        # Ordered dedup -- the in-tree, custom and standard path sources may overlap.
+        return [p for p in dict.fromkeys(asPaths) if isDirCached(p)];
 
     def getLibSearchPaths(self):
         """
@@ -836,8 +1449,7 @@ class LibraryCheck(CheckBase):
             #
             # Desperate fallback.
             #
-            asRootDrives = [d+":" for d in "CDEFGHIJKLMNOPQRSTUVWXYZ" if pathExists(d+":")];
-            for r in asRootDrives:
+            for r in getWinRootDrives():
                 asPaths += [os.path.join(r, p) for p in [
                     '\\msys64\\mingw64\\lib', '\\msys64\\mingw32\\lib', '\\lib']];
                 asPaths += [r'c:\\Program Files', r'c:\\Program Files (x86)'];
@@ -856,19 +1468,78 @@ class LibraryCheck(CheckBase):
             else: # Darwin
                 asPaths.append("/opt/homebrew/lib");
         #
-        # Walk the custom path to guess where the lib files are.
+        # Scan the custom path to guess where the lib files are.
         #
         if self.sCustomPath:
             for sLibFile in self.asLibFiles:
-                for sRoot, _, asFiles in os.walk(self.sCustomPath):
-                    if sLibFile in asFiles:
-                        asPaths = [ sRoot ] + asPaths;
+                sDir = findFileUnder(self.sCustomPath, sLibFile);
+                if sDir:
+                    asPaths = [ sDir ] + asPaths;
+
+        # Ordered dedup -- the in-tree, custom and standard path sources may overlap.
+        return [p for p in dict.fromkeys(asPaths) if pathExistsCached(p)];
+
+    def probeHeadersBatch(self, asHeaders, asSearchPaths, asSanityHeaders = None):
+        """
+        Asks the preprocessor to resolve all headers in one go (cc -E -H).
+
+        One subprocess replaces the headers x paths isfile loop; the compiler
+        reports every header it resolved with a '. /path/to/header' line on
+        stderr and its own directory lookup is readdir-cached.
 
-        return [p for p in asPaths if pathExists(p)];
+        Headers listed in asSanityHeaders must resolve like the others but
+        their directories aren't recorded -- they only prove the compile
+        environment works (e.g. 'iostream'), and recording them would put the
+        C++ runtime dir in front of the library's own include dir.
 
-    def checkInc(self):
+        Returns the list of include directories the headers were found in, or
+        None if not all resolved (the caller then falls back to the Python loop).
+        """
+        if g_enmHostTarget == BuildTarget.WINDOWS:
+            return None; # cl.exe speaks /showIncludes; not worth a second parser.
+        sCompiler = g_oEnv['config_cpp_compiler'] if hasCPPHeader(asHeaders) else g_oEnv['config_c_compiler'];
+        if not sCompiler:
+            return None;
+        sCode = ''.join(f'#include <{sHdr}>\n' for sHdr in asHeaders);
+        sFileSource = os.path.join(getProbeDir(), \
+                                   hashlib.sha1(sCode.encode('utf-8')).hexdigest()[:16] + '.hdrprobe.cpp');
+        try:
+            writeFileRaw(sFileSource, sCode);
+            asCmd = [ sCompiler, '-E', '-H', '-o', os.devnull ] \
+                  + [ f'-I{sIncPath}' for sIncPath in asSearchPaths ] + [ sFileSource ];
+            oProc = subprocess.run(asCmd, stdout = subprocess.PIPE, stderr = subprocess.PIPE, check = False, timeout = 15);
+        except (OSError, subprocess.SubprocessError) as ex:
+            self.printVerbose(1, f'Batched header probe failed: {str(ex)}');
+            return None;
+        if oProc.returncode != 0:
+            return None;
+        # Directly included headers are reported with a single dot; nested
+        # includes carry more dots and don't interest us here.
+        asIncPaths = [];
+        asHeaderLeft = list(asHeaders);
+        # No output cap here: nested includes can easily push the interesting
+        # direct-include lines beyond it.
+        for sLine in oProc.stderr.decode('utf-8', 'replace').splitlines():
+            if not sLine.startswith('. '):
+                continue;
+            sHdrPath = sLine[2:].strip();
+            for sHdr in asHeaderLeft:
+                if sHdrPath.endswith(sHdr):
+                    if not asSanityHeaders or sHdr not in asSanityHeaders:
+                        asIncPaths.append(sHdrPath[:-len(sHdr)].rstrip('/'));
+                    asHeaderLeft.remove(sHdr);
+                    break;
+        if asHeaderLeft: # Shouldn't happen if the preprocessor succeeded, but be safe.
+            return None;
+        return list(dict.fromkeys(asIncPaths));
+
+    def checkInc(self, fLog = True):
         """
         Checks for headers in standard/custom include paths.
+
+        Pass fLog = False to suppress the error on failure (used by the
+        speculative fast paths in performCheck, which still fall back to
+        probeAll and the logging split stages).
         """
         if not self.asIncFiles and not self.asAltIncFiles:
             return True;
@@ -879,10 +1550,36 @@ class LibraryCheck(CheckBase):
         asAltHeaderToSearch = self.asAltIncFiles;
         asHeaderFound = [];
         asSearchPaths = self.asIncPaths + self.getIncSearchPaths();
-        for sCurHeader in asHeaderToSearch + asAltHeaderToSearch:
+        # Keyed on header names + search path mtimes, so installing/removing headers invalidates the entry.
+        sCacheKey = ProbeCache.calcKey([ 'inc', self.sName, asHeaderToSearch, asAltHeaderToSearch, \
+                                         asSearchPaths, getPathMtimes(asSearchPaths) ]);
+        aCached = g_oProbeCache.get(sCacheKey);
+        if aCached is not None:
+            fRc, asIncPaths = aCached;
+            self.asIncPaths = list(asIncPaths);
+            self.printVerbose(1, 'Using cached include search result');
+            return fRc;
+        # A library header no search path has by a plain stat test can't be
+        # found by the compiler dry run either; answer "missing" with a few
+        # syscalls instead of a compiler spawn (common on minimal systems).
+        if not g_fSlowProbes:
+            for sCurHeader in self.asIncFiles:
+                if not any(isRegularFile(os.path.join(sCurSearchPath, sCurHeader)) for sCurSearchPath in asSearchPaths):
+                    if fLog:
+                        self.printError(f"Header file {sCurHeader} not found in paths: {asSearchPaths}");
+                    g_oProbeCache.set(sCacheKey, [ False, self.asIncPaths ]);
+                    return False;
+        # Let the compiler resolve all required headers with one dry run; fall
+        # back to the per-header/per-path loop when it can't (or on Windows).
+        asViaCompiler = None if g_fSlowProbes else self.probeHeadersBatch(asHeaderToSearch, asSearchPaths, \
+                                                                          asSanityHeaders = [ 'iostream' ]);
+        if asViaCompiler is not None:
+            self.asIncPaths.extend([ s for s in asViaCompiler if s not in self.asIncPaths ]);
+            asHeaderFound.extend(asHeaderToSearch);
+        for sCurHeader in (asHeaderToSearch if asViaCompiler is None else []) + asAltHeaderToSearch:
             for sCurSearchPath in asSearchPaths:
                 self.printVerbose(1, f"Checking include path for '{sCurHeader}': {sCurSearchPath}");
-                if isFile(os.path.join(sCurSearchPath, sCurHeader)):
+                if isRegularFile(os.path.join(sCurSearchPath, sCurHeader)):
                     if os.sep == "\\":
                         sCurSearchPath = sCurSearchPath.replace("/", "\\");
                     self.asIncPaths.extend([ sCurSearchPath ]);
@@ -891,15 +1588,21 @@ class LibraryCheck(CheckBase):
 
         for sHdr in asHeaderToSearch:
             if sHdr not in asHeaderFound:
-                self.printError(f"Header file {sHdr} not found in paths: {asSearchPaths}");
+                if fLog:
+                    self.printError(f"Header file {sHdr} not found in paths: {asSearchPaths}");
+                g_oProbeCache.set(sCacheKey, [ False, self.asIncPaths ]);
                 return False;
 
         self.printVerbose(1, 'All header files found');
+        g_oProbeCache.set(sCacheKey, [ True, self.asIncPaths ]);
         return True;
 
-    def checkLib(self):
+    def checkLib(self, fLog = True):
         """
         Checks for libraries in standard/custom lib paths.
+
+        Pass fLog = False to suppress the error on failure (used by probeAll,
+        where a successful link already proved the library exists).
         """
         if not self.asLibFiles:
             return True;
@@ -913,22 +1616,44 @@ class LibraryCheck(CheckBase):
             asLibExts = [ '.a', '.so' ];
         asLibFound = [];
         asSearchPaths = self.asLibPaths + self.getLibSearchPaths();
+        # Keyed on lib names + search path mtimes, so installing/removing libraries invalidates the entry.
+        sCacheKey = ProbeCache.calcKey([ 'lib', self.sName, asLibToSearch, asLibExts, \
+                                         asSearchPaths, getPathMtimes(asSearchPaths) ]);
+        aCached = g_oProbeCache.get(sCacheKey);
+        if aCached is not None:
+            fRc, asLibPaths = aCached;
+            self.asLibPaths = list(asLibPaths);
+            self.printVerbose(1, 'Using cached library search result');
+            return fRc;
         for sCurSearchPath in asSearchPaths:
-            for sCurLib in asLibToSearch:
-                for sCurExt in asLibExts:
-                    sPattern = os.path.join(sCurSearchPath, f"{sCurLib}*{sCurExt}");
-                    self.printVerbose(1, f"Checking library path for '{sPattern}': {sCurSearchPath}");
-                    for sCurFile in glob.glob(sPattern):
-                        if isFile(sCurFile) \
-                        or os.path.islink(sCurFile):
+            if sCurSearchPath in LibraryCheck.s_asUnscannableDirs:
+                continue;
+            # Read the directory once and match names in memory instead of one
+            # glob (= one directory read) per library/extension combination.
+            self.printVerbose(1, f"Checking library path: {sCurSearchPath}");
+            try:
+                aoEntries = os.scandir(sCurSearchPath);
+            except OSError:
+                LibraryCheck.s_asUnscannableDirs.add(sCurSearchPath);
+                continue;
+            with aoEntries:
+                for oEntry in aoEntries:
+                    for sCurLib in asLibToSearch:
+                        if  oEntry.name.startswith(sCurLib) \
+                        and any(oEntry.name.endswith(sCurExt) for sCurExt in asLibExts) \
+                        and (oEntry.is_file() or oEntry.is_symlink()):
                             self.asLibPaths.extend([ sCurSearchPath ]);
+                            g_oProbeCache.set(sCacheKey, [ True, self.asLibPaths ]);
                             return True;
 
         if asLibFound == asLibToSearch:
             self.printVerbose(1, 'All libraries found');
+            g_oProbeCache.set(sCacheKey, [ True, self.asLibPaths ]);
             return True;
 
-        self.printError(f"Library files { ' '.join(asLibToSearch)} not found in paths: {asSearchPaths}");
+        if fLog:
+            self.printError(f"Library files { ' '.join(asLibToSearch)} not found in paths: {asSearchPaths}");
+        g_oProbeCache.set(sCacheKey, [ False, self.asLibPaths ]);
         return False;
 
     def performCheck(self):
@@ -948,7 +1673,7 @@ class LibraryCheck(CheckBase):
                 print(f"Found library in-tree at '{sCurMatch}', skipping check");
                 self.fHave = True;
                 # Extract the version from the directory name.
-                oReMatch = re.search(r'-([\d\.]+)$', os.path.basename(os.path.normpath(sCurMatch)));
+                oReMatch = g_oReInTreeVer.search(os.path.basename(os.path.normpath(sCurMatch)));
                 if oReMatch:
                     self.sVer = oReMatch.group(1);
                 self.asIncPaths.extend([ os.path.relpath(sCurMatch, g_sScriptPath) ]); # Make the path relative to the script.
@@ -960,10 +1685,34 @@ class LibraryCheck(CheckBase):
             fRc = True;
             if self.fnCallback:
                 fRc = self.fnCallback(self);
-            if  fRc \
-            and self.checkInc():
-                if self.checkLib():
-                    self.fHave, _, _ = self.compileAndExecute(g_oEnv['KBUILD_TARGET'], g_oEnv['KBUILD_TARGET_ARCH']);
+            if fRc:
+                # Libraries with a known version macro can be answered by a
+                # preprocessor run plus a library file lookup -- no link, no
+                # execution of a test binary (also works when cross-building).
+                if not g_fSlowProbes:
+                    # A version from the bulk pkg-config query counts too, as
+                    # long as the headers are actually locatable.  These
+                    # probes are speculative -- probeAll and the split stages
+                    # below still run on a miss, so don't log/count errors
+                    # here (e.g. a library only the linker default path has).
+                    sVer = self.sPkgConfigVer if self.sPkgConfigVer is not None and self.checkInc(fLog = False) else None;
+                    if sVer is None:
+                        sVer = self.probeVersionMacro();
+                    if  sVer is not None \
+                    and self.checkLib(fLog = False):
+                        self.sVer = sVer;
+                        self.fHave = True;
+                        return self.fHave;
+                # Try answering everything with one combined compile probe first;
+                # fall back to the split header/library stages when it can't
+                # (or when --slow-probes was given for debugging).
+                if  not g_fSlowProbes \
+                and self.fBatchSyntaxOk is not False \
+                and self.probeAll():
+                    self.fHave = True;
+                elif self.checkInc():
+                    if self.checkLib():
+                        self.fHave, _, _ = self.compileAndExecute(g_oEnv['KBUILD_TARGET'], g_oEnv['KBUILD_TARGET_ARCH']);
             if not self.fHave:
                 self.printError('Library not found');
         return self.fHave;
@@ -1072,9 +1821,10 @@ class ToolCheck(CheckBase):
         """
         Apply argparse options for disabling the tool.
         """
+        mapArgs = vars(oArgs); # Plain dict lookups instead of getattr reflection.
         sToolName = self.sName.replace("-", "_"); # So that we can use variables directly w/o getattr.
-        self.fDisabled = getattr(oArgs, f"config_tools_disable_{sToolName}", False);
-        self.sCustomPath = getattr(oArgs, f"config_tools_path_{sToolName}", None);
+        self.fDisabled = mapArgs.get(f"config_tools_disable_{sToolName}", False);
+        self.sCustomPath = mapArgs.get(f"config_tools_path_{sToolName}");
 
     def performCheck(self):
         """
@@ -1118,23 +1868,8 @@ class ToolCheck(CheckBase):
     def getWinProgramFiles(self):
         """
         Returns a list of existing Windows "Program Files" directories.
-
-        @todo Cache this?
         """
-        asPaths = [];
-        for sEnv in [ 'ProgramFiles', r'C:\Program File', \
-                      'ProgramFiles(x86)', r'C:\Program Files (x86)',
-                      'ProgramFiles(Arm)', r'C:\Program Files (Arm)' ]:
-            sPath = os.environ.get(sEnv);
-            if sPath and pathExists(sPath):
-                asPaths.extend([ sPath ]);
-
-        if 'programfiles' in g_asPathsPrepend:
-            asPaths = g_asPathsPrepend['programfiles'] + asPaths;
-        if 'programfiles' in g_asPathsAppend:
-            asPaths.extend(g_asPathsAppend['programfiles']);
-
-        return asPaths;
+        return getWinProgramFilesPaths();
 
     def checkCallback_GSOAP(self):
         """
@@ -1152,10 +1887,9 @@ class ToolCheck(CheckBase):
         _, asLibs = getPackageLibs('gsoapssl++');
 
         if not sPath: # Try in dev tools.
-            asDevPaths = sorted(glob.glob(f'{g_sDevPath}/common/gsoap/v*'));
-            for sDevPath in asDevPaths:
-                if pathExists(sDevPath):
-                    sPath = sDevPath;
+            for sDevPath in scanDirSorted(os.path.join(g_sDevPath, 'common', 'gsoap')):
+                if os.path.basename(sDevPath).startswith('v'):
+                    sPath = sDevPath; # Keep going; the highest version wins.
 
         # Detect binaries.
         sPathBin = None;
@@ -1348,38 +2082,31 @@ class ToolCheck(CheckBase):
             # Since VS 2017 we can use vswhere.exe, so try using that first.
             for sProgramPath in self.getWinProgramFiles():
                 sPath = os.path.join(sProgramPath, 'Microsoft Visual Studio', 'Installer', 'vswhere.exe');
-                if isFile(sPath):
-                    # Stupid vswhere can't handle multiple properties at once, so we have to deal with it
-                    # by calling it multiple times. Joy.
-                    asProps = [ 'installationVersion', 'installationPath', 'displayName' ];
-                    for sCurProp in asProps:
-                        asCmd = [ sPath,
-                                '-sort', # Sort newest version first.
-                                '-products', '*',
-                                '-requires', 'Microsoft.VisualStudio*',
-                                '-property', sCurProp,
-                                '-format', 'json' ];
-                        oProc = subprocess.run(asCmd, capture_output = True, check = False, text = True);
-                        if oProc.returncode == 0 and oProc.stdout.strip():
-                            import json
-                            asList = json.loads(oProc.stdout);
-                            for curProd in asList:
-                                if sCurProp == 'installationVersion':
-                                    sVCPPVer = curProd.get('installationVersion', None);
-                                if sCurProp == 'installationPath':
-                                    sVCPPPath = curProd.get('installationPath', None);
-                                if sCurProp == 'displayName':
-                                    self.printVerbose(1, f"Found {curProd.get('displayName', '')} version {sVCPPVer} at '{sVCPPPath}'");
-
-                    if not g_fDebug:
-                        break;
-
+                if not isRegularFile(sPath):
+                    continue;
+                # Without '-property' vswhere emits the full JSON object per
+                # install, so one invocation yields all three properties
+                # instead of one process spawn + JSON parse each.
+                asCmd = [ sPath,
+                        '-sort', # Sort newest version first.
+                        '-products', '*',
+                        '-requires', 'Microsoft.VisualStudio*',
+                        '-format', 'json',
+                        '-utf8' ];
+                # No text=True: json.loads takes the UTF-8 bytes as-is, so no
+                # point in locale-decoding several KB of JSON up front.
+                oProc = subprocess.run(asCmd, capture_output = True, check = False);
+                if oProc.returncode == 0 and oProc.stdout.strip():
+                    asList = json.loads(oProc.stdout);
+                    for curProd in asList:
+                        sVCPPVer  = curProd.get('installationVersion', None);
+                        sVCPPPath = curProd.get('installationPath', None);
+                        self.printVerbose(1, f"Found {curProd.get('displayName', '')} version {sVCPPVer} at '{sVCPPPath}'");
                 if sVCPPVer:
-                    break;
+                    break; # No point in asking the other Program Files roots again.
 
             # For older versions we have to use the registry. Start with "newest" first.
             if not sVCPPVer:
-                import winreg
                 for uVer, sName in [(14, "2015"), (12, "2013"), (11, "2012"), (10, "2010")]:
                     try:
                         sVer = r'SOFTWARE\Microsoft\VisualStudio\{}.0\Setup\VC'.format(uVer);
@@ -1398,9 +2125,12 @@ class ToolCheck(CheckBase):
                 # Used for internal tools.
                 sVCPPBasePath = os.path.join(sVCPPPath, 'Tools', 'MSVC');
 
-            asVCPPVer = sorted(glob.glob(os.path.join(sVCPPBasePath, '*')), reverse = True);
-            for sVer in asVCPPVer:
-                sVCPPBasePath = os.path.join(sVCPPBasePath, sVer);
+            # Sorted newest first; only the newest toolset is wanted.  The old
+            # loop re-joined every entry onto the base path and ended up with
+            # whatever came last (the oldest version).
+            asVCPPVer = scanDirSorted(sVCPPBasePath, fReverse = True);
+            if asVCPPVer:
+                sVCPPBasePath = asVCPPVer[0];
 
             # The order is important here for parsing lateron.
             # Key: Visual Studio Version -- Tuple: MSVC Toolset Version, MSVC Toolset Define (kBuild), Description.
@@ -1424,6 +2154,7 @@ class ToolCheck(CheckBase):
             sVCPPVer    = '.'.join(sVCPPVer.split('.')[:2]); # Strip build #.
             sVCPPArchBinPath = None;
 
+            import fnmatch; # Only needed for the toolset version patterns below.
             asMatches = [];
             # Match all versions.
             for sVer, (sToolset, sScheme, sDesc) in mapVsToolsScheme.items():
@@ -1527,7 +2258,6 @@ class ToolCheck(CheckBase):
             sSDKVer = '.'.join(str(s) for _, s in enumerate(sSDKVer));
         else: # Ask the registry for the installation path.
             try:
-                import winreg;
                 with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE,
                                     r'SOFTWARE\Microsoft\Windows Kits\Installed Roots') as oKey:
 
@@ -1603,7 +2333,6 @@ class ToolCheck(CheckBase):
                 r"SOFTWARE\Wow6432Node\Microsoft\WINDDK" # Legacy DDKs.
             ];
 
-            import winreg;
             for sCurKey in asRegKey:
                 try:
                     with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, sCurKey) as key:
@@ -1682,15 +2411,25 @@ class ToolCheck(CheckBase):
             if not pathExists(sPath):
                 sPath = os.path.join(g_sScriptPath, 'kBuild');
             sPathTgt = os.path.join(sPath, 'bin', g_oEnv['KBUILD_TARGET'] + "." + g_oEnv['KBUILD_TARGET_ARCH']);
-            if pathExists(sPathTgt):
-                if  checkWhich('kmk', 'kBuild kmk', sPathTgt) \
-                and checkWhich('kmk_ash', 'kBuild kmk_ash', sPathTgt) \
-                and isFile(os.path.join(sPath, 'footer.kmk')) \
-                and isFile(os.path.join(sPath, 'header.kmk')) \
-                and isFile(os.path.join(sPath, 'rules.kmk')):
-                    g_oEnv.set('KBUILD_PATH', sPath);
-                    self.sCmdPath = g_oEnv['KBUILD_PATH'];
-                    fFound = True;
+            # One directory read answers all the file-presence questions;
+            # checkWhich (which execs the tool) only runs if the binaries exist.
+            try:
+                asNames = { oEntry.name for oEntry in os.scandir(sPath) };
+            except OSError:
+                asNames = set();
+            sBinSuff = '.exe' if g_enmHostTarget == BuildTarget.WINDOWS else '';
+            try:
+                asBinNames = { oEntry.name for oEntry in os.scandir(sPathTgt) };
+            except OSError:
+                asBinNames = set();
+            if  { 'footer.kmk', 'header.kmk', 'rules.kmk' } <= asNames \
+            and 'kmk' + sBinSuff in asBinNames \
+            and 'kmk_ash' + sBinSuff in asBinNames \
+            and checkWhich('kmk', 'kBuild kmk', sPathTgt) \
+            and checkWhich('kmk_ash', 'kBuild kmk_ash', sPathTgt):
+                g_oEnv.set('KBUILD_PATH', sPath);
+                self.sCmdPath = g_oEnv['KBUILD_PATH'];
+                fFound = True;
 
         # If KBUILD_DEVTOOLS is set, check that it's pointing to something useful.
         sPathDevTools = os.environ.get('KBUILD_DEVTOOLS');
@@ -1759,16 +2498,18 @@ class ToolCheck(CheckBase):
             self.printError('GCC and G++ versions do not match!');
             return False;
 
+        sTargetArch = g_oEnv['KBUILD_TARGET_ARCH']; # Hoisted; consulted several times below.
+
         g_oEnv.set('CC32',  os.path.basename(asToolsToCheck['gcc'].sPath));
         g_oEnv.set('CXX32', os.path.basename(asToolsToCheck['g++'].sPath));
         if g_enmHostArch == BuildArch.AMD64:
             g_oEnv.append('CC32',  ' -m32');
             g_oEnv.append('CXX32', ' -m32');
         elif g_enmHostArch == BuildArch.X86 \
-        and  g_oEnv['KBUILD_TARGET_ARCH'] == BuildArch.AMD64: ## @todo Still needed?
+        and  sTargetArch == BuildArch.AMD64: ## @todo Still needed?
             g_oEnv.append('CC32',  ' -m64');
             g_oEnv.append('CXX32', ' -m64');
-        elif g_oEnv['KBUILD_TARGET_ARCH'] == BuildArch.AMD64:
+        elif sTargetArch == BuildArch.AMD64:
             g_oEnv.unset('CC32');
             g_oEnv.unset('CXX32');
 
@@ -1807,8 +2548,8 @@ class ToolCheck(CheckBase):
         g_oEnv.set('TOOL_Bs3Gcc64Elf64_CXX', sCXX64 if sCXX64 else sCXX);
 
         # Solaris sports a 32-bit gcc/g++.
-        if  g_oEnv['KBUILD_TARGET']      == BuildTarget.SOLARIS \
-        and g_oEnv['KBUILD_TARGET_ARCH'] == BuildArch.AMD64:
+        if  g_oEnv['KBUILD_TARGET'] == BuildTarget.SOLARIS \
+        and sTargetArch             == BuildArch.AMD64:
             g_oEnv.set('CC' , 'gcc -m64' if sCC == 'gcc' else None);
             g_oEnv.set('CXX', 'gxx -m64' if sCC == 'gxx' else None);
 
@@ -1841,28 +2582,31 @@ class ToolCheck(CheckBase):
 
         g_oEnv.set('VBOX_WITH_OPEN_WATCOM', ''); # Set to disabled by default first.
 
-        if  g_oEnv['KBUILD_TARGET']      == BuildTarget.DARWIN \
-        and g_oEnv['KBUILD_TARGET_ARCH'] == BuildArch.ARM64:
+        enmTarget     = g_oEnv['KBUILD_TARGET'];      # Hoisted; consulted several times below.
+        enmTargetArch = g_oEnv['KBUILD_TARGET_ARCH'];
+
+        if  enmTarget     == BuildTarget.DARWIN \
+        and enmTargetArch == BuildArch.ARM64:
             self.printVerbose(1, 'OpenWatcom not used here (yet), skipping');
             return True;
 
         # These are the sub directories OpenWatcom ships its binaries in.
         mapBuildTarget2Bin = {
             BuildTarget.DARWIN:  "binosx",  ## @todo Still correct for Apple Silicon?
-            BuildTarget.LINUX:   "binl" if g_oEnv['KBUILD_TARGET_ARCH'] is BuildArch.AMD64 else "binl", # ASSUMES 64-bit.
+            BuildTarget.LINUX:   "binl" if enmTargetArch is BuildArch.AMD64 else "binl", # ASSUMES 64-bit.
             BuildTarget.SOLARIS: "binsol",  ## @todo Test on Solaris.
             BuildTarget.WINDOWS: "binnt",
             BuildTarget.BSD:     "binnbsd"  ## @todo Test this on FreeBSD.
         };
 
-        sBinSubdir = mapBuildTarget2Bin.get(g_oEnv['KBUILD_TARGET'], None);
+        sBinSubdir = mapBuildTarget2Bin.get(enmTarget, None);
         if not sBinSubdir:
-            self.printError(f"OpenWatcom not supported on host target { g_oEnv['KBUILD_TARGET'] }.");
+            self.printError(f"OpenWatcom not supported on host target { enmTarget }.");
             return False;
 
         sPath = self.sCustomPath;
         if not sPath:
-            if g_oEnv['KBUILD_TARGET'] == BuildTarget.LINUX:
+            if enmTarget == BuildTarget.LINUX:
                 # Modern distros might have Snap installed for which there is an Open Watcom package.
                 # Check for this.
                 sPath = os.path.join('/', 'snap', 'open-watcom', 'current');
@@ -1904,7 +2648,8 @@ class ToolCheck(CheckBase):
         # Due to Windows App sandboxing and permissions, the include directory returned by a Python installation
         # from the Microsoft Store (or App packages) will point to the inaccessible WindowsApp directory.
         # So detect that and refuse to continue.
-        asPathInc = sysconfig.get_paths()[ 'include' ];
+        mapSysPaths = sysconfig.get_paths(); # Fetched once; each call rebuilds the dict.
+        asPathInc = mapSysPaths[ 'include' ];
         if not asPathInc:
             self.printError('Python installation invalid (include path) not found');
             return False;
@@ -1924,7 +2669,7 @@ int main()
         sLdLib  = libraryFileStripSuffix(sysconfig.get_config_var("LDLIBRARY"));
 
         # Make sure that the Python .dll / .so files are in PATH.
-        g_oEnv.prependPath('PATH', sysconfig.get_paths()[ 'data' ]);
+        g_oEnv.prependPath('PATH', mapSysPaths[ 'data' ]);
 
         if compileAndExecute('Python C API', g_oEnv['KBUILD_TARGET'], g_oEnv['KBUILD_TARGET_ARCH'], [ asPathInc ], [ sLibDir ], [ ], [ sLdLib ], sCode):
             g_oEnv.set('VBOX_WITH_PYTHON', '1' if asPathInc else None);
@@ -1944,17 +2689,20 @@ int main()
             self.printVerbose(1, 'Python disbled, skipping');
             return True;
 
+        import importlib.util;
+
         fFound = True;
-        asModulesToCheck = [ 'packaging' ];
 
         self.printVerbose(1, 'Checking modules ...');
 
-        for asCurMod in asModulesToCheck:
-            try:
-                importlib.import_module(asCurMod);
-            except ImportError:
-                self.printError(f"Python module '{asCurMod}' is not installed");
-                self.printError(f"Hint: Try running 'pip install {asCurMod}'", fDontCount=True);
+        for sCurMod in g_asRequiredPyModules:
+            if sCurMod in sys.modules: # Already loaded -- nothing to walk.
+                continue;
+            # find_spec only walks the import finders; no point in actually
+            # executing a module just to learn that it is installed.
+            if importlib.util.find_spec(sCurMod) is None:
+                self.printError(f"Python module '{sCurMod}' is not installed");
+                self.printError(f"Hint: Try running 'pip install {sCurMod}'", fDontCount=True);
                 fFound = False;
                 if not g_fContOnErr:
                     return fFound;
@@ -2020,12 +2768,14 @@ int main()
         Checks for NSIS (Nullsoft Scriptable Install System).
         """
         sPath = self.sCustomPath;
-        if not sPath:
+        # The registry is only available (and winreg only imported) on Windows;
+        # elsewhere NSIS can still be given via --with-win-nsis-path.
+        if  not sPath \
+        and g_enmHostTarget == BuildTarget.WINDOWS:
             asRegKey = [ r'SOFTWARE\WOW6432Node\NSIS',
                          r'SOFTWARE\NSIS', # x86 only, so unlikely.
                        ];
 
-            import winreg;
             for hive in (winreg.HKEY_LOCAL_MACHINE,):
                 for key_path in asRegKey:
                     try:
@@ -2111,6 +2861,9 @@ int main()
 
         return True if sPath else False;
 
+# Translation table for converting Windows to UNIX path separators (for kBuild).
+g_mapBackslash2Slash = str.maketrans('\\', '/');
+
 class EnvManager:
     """
     A simple manager for environment variables.
@@ -2146,7 +2899,8 @@ class EnvManager:
         Appends a value to an existing key.
         If the key does not exist yet, it will be created.
         """
-        return self.set(sKey, self.env[sKey] + sVal if sKey in self.env else sVal);
+        sCur = self.env.get(sKey); # One lookup instead of the 'in' + '[]' pair.
+        return self.set(sKey, sCur + sVal if sCur is not None else sVal);
 
     def prependPath(self, sKey, sPath, enmBuildTarget = g_enmHostTarget):
         """
@@ -2154,12 +2908,20 @@ class EnvManager:
         """
         if not sPath or len(sPath) == 0:
             return True;
-        if sKey not in self.env:
+        sCur = self.env.get(sKey); # One lookup instead of the 'in' + '[]' pair.
+        if sCur is None:
             return self.set(sKey, sPath);
         sDelim = ';' if enmBuildTarget == BuildTarget.WINDOWS else ':';
+        # No-op if the path already is a delimited segment; otherwise repeated
+        # checks keep growing the value (and every later copy of it) unboundedly.
+        if  sCur == sPath \
+        or  sCur.startswith(sPath + sDelim) \
+        or  sCur.endswith(sDelim + sPath) \
+        or  sDelim + sPath + sDelim in sCur:
+            return True;
         if g_fDebug:
             assert isDir(sPath), f"Path '{sPath}' does not exist!";
-        return self.set(sKey, sPath + sDelim + self.env[sKey]);
+        return self.set(sKey, sPath + sDelim + sCur);
 
     def get(self, key, default=None):
         """
@@ -2202,19 +2964,31 @@ class EnvManager:
                 printVerbose(1, f'Key {sKey} does not exist -- skipping!');
             return True;
         if sVal:
-            sVal = ''.join(c if c != '\\' else '/' for c in sVal); # Translate to UNIX paths (for kBuild).
+            # Translate to UNIX paths (for kBuild); str.translate runs in C
+            # instead of a per-character Python loop.
+            sVal = sVal.translate(g_mapBackslash2Slash);
         fh.write(f"{sWhat if sWhat else ''}{sKey}={sVal if sVal else self.env[sKey]}\n");
 
     def write_all(self, fh, sWhat = None, asPrefixInclude = None, asPrefixExclude = None):
         """
         Writes all stored environment variables as KEY=VALUE pairs to the given file handle.
         """
+        # str.startswith takes a tuple of prefixes and tests them in C; no
+        # per-key Python generator needed.
+        tsPrefixExclude = tuple(asPrefixExclude) if asPrefixExclude else None;
+        tsPrefixInclude = tuple(asPrefixInclude) if asPrefixInclude else None;
+        sWhat = sWhat if sWhat else '';
         for sKey, sVal in self.env.items():
-            if asPrefixExclude and any(sKey.startswith(p) for p in asPrefixExclude):
+            if tsPrefixExclude and sKey.startswith(tsPrefixExclude):
                 continue;
-            if asPrefixInclude and not any(sKey.startswith(p) for p in asPrefixInclude):
+            if tsPrefixInclude and not sKey.startswith(tsPrefixInclude):
                 continue;
-            self.write_single(fh, sKey, sVal, sWhat if sWhat else '');
+            # Inlined write_single: the key obviously exists and the prefix
+            # was normalized above, so skip the per-key re-checks.
+            if sVal:
+                # Translate to UNIX paths (for kBuild).
+                sVal = sVal.translate(g_mapBackslash2Slash);
+            fh.write(f"{sWhat}{sKey}={sVal}\n");
         return True;
 
     def write_all_as_exports(self, fh, enmBuildTarget, asPrefixInclude = None, asPrefixExclude = None):
@@ -2243,15 +3017,6 @@ class EnvManager:
         sWhat = 'set ' if enmBuildTarget == BuildTarget.WINDOWS else 'export ';
         return self.write(fh, sKey, sWhat);
 
-    def transform(self, mapTransform):
-        """
-        Evaluates mapping expressions and updates the affected environment variables.
-        """
-        for exprCur in mapTransform:
-            result = exprCur(self.env);
-            if isinstance(result, dict):
-                self.env.update(result);
-
     def __getitem__(self, sName):
         """
         Magic function to return an environment variable if found, None if not found.
@@ -2262,6 +3027,174 @@ class EnvManager:
 # This hold the configuration we later serialize into files.
 g_oEnv = EnvManager();
 
+def _initCheckWorker(mapEnv, fDebug, cVerbosity, fCompatMode, fSlowProbes, sProbeDir):
+    """
+    Initializes a check worker process with the parent's configuration state.
+
+    Each worker gets its own temp directory so probe files don't collide
+    between concurrently running checks.  It lives inside the parent's probe
+    dir, so the parent's exit cleanup removes it too -- workers exit via
+    os._exit and never run their own atexit handlers.
+    """
+    global g_fDebug, g_cVerbosity, g_fCompatMode, g_fSlowProbes;
+    g_oEnv.env   = mapEnv;
+    g_fDebug     = fDebug;
+    g_cVerbosity = cVerbosity;
+    g_fCompatMode = fCompatMode;
+    g_fSlowProbes = fSlowProbes;
+    tempfile.tempdir = tempfile.mkdtemp(prefix = 'vbox-configure-', dir = sProbeDir);
+
+def _runOneCheck(oCheck):
+    """
+    Runs a single check in a worker process.
+
+    All output is buffered so the parent can re-emit it without interleaving.
+
+    Returns a tuple of (mutated check, stdout text, stderr text, error count,
+    warning count, probe cache entries).
+    """
+    global g_cErrors, g_cWarnings;
+    g_cErrors   = 0;
+    g_cWarnings = 0;
+    oStdOut = io.StringIO();
+    oStdErr = io.StringIO();
+    sys.stdout = oStdOut;
+    sys.stderr = oStdErr;
+    oCheck.performCheck();
+    return oCheck, oStdOut.getvalue(), oStdErr.getvalue(), g_cErrors, g_cWarnings, g_oProbeCache.mapEntries;
+
+def runChecksParallel(aoChecks):
+    """
+    Runs a list of independent checks in parallel worker processes.
+
+    The mutated instance fields are copied back into the original objects and
+    the worker output is re-emitted in check order.
+
+    Returns False if any check failed, True otherwise.
+    """
+    global g_cErrors, g_cWarnings;
+    if not aoChecks:
+        return True;
+    fRc = True;
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers = min(len(aoChecks), os.cpu_count() or 1), \
+                                                    initializer = _initCheckWorker, \
+                                                    initargs = (g_oEnv.env, g_fDebug, g_cVerbosity, g_fCompatMode, g_fSlowProbes, \
+                                                                getProbeDir())) as oExecutor:
+            for oCheck, tResult in zip(aoChecks, oExecutor.map(_runOneCheck, aoChecks)):
+                oCheckDone, sStdOut, sStdErr, cErrors, cWarnings, mapCacheEntries = tResult;
+                oCheck.__dict__.update(oCheckDone.__dict__);
+                if sStdOut:
+                    sys.stdout.write(sStdOut);
+                if sStdErr:
+                    sys.stderr.write(sStdErr);
+                g_cErrors   += cErrors;
+                g_cWarnings += cWarnings;
+                g_oProbeCache.merge(mapCacheEntries);
+                if oCheckDone.fHave is False:
+                    fRc = False;
+    except (OSError, concurrent.futures.process.BrokenProcessPool) as ex:
+        # No usable process pool (restricted environments) -- fall back to sequential checks.
+        printWarn(f'Parallel checks not possible ({str(ex)}), running sequentially');
+        for oCheck in aoChecks:
+            if  not oCheck.performCheck() \
+            and not g_fContOnErr:
+                return False;
+    return fRc;
+
+def queryPkgConfigVersions(aoLibs):
+    """
+    Asks pkg-config for the versions of all libraries with a known .pc module
+    in one query, instead of one probe per library.
+
+    Answers land in oLib.sPkgConfigVer; libraries pkg-config doesn't know stay
+    on the regular probe path, so a stale or missing .pc file costs nothing.
+    """
+    if  g_enmHostTarget == BuildTarget.WINDOWS \
+    or  g_fSlowProbes:
+        return;
+    aoPkgLibs = [ oLib for oLib in aoLibs if oLib.sPkgConfigName ];
+    # One retry with the packages pkg-config complained about removed; those
+    # may still be found in-tree or by the compile probes.
+    for _ in range(2):
+        if not aoPkgLibs:
+            return;
+        asCmd = [ 'pkg-config', '--modversion' ] + [ oLib.sPkgConfigName for oLib in aoPkgLibs ];
+        try:
+            oProc = subprocess.run(asCmd, stdout = subprocess.PIPE, stderr = subprocess.PIPE, check = False, timeout = 15);
+        except (OSError, subprocess.SubprocessError) as ex:
+            printVerbose(1, f'Bulk pkg-config query failed: {str(ex)}');
+            return;
+        if oProc.returncode == 0:
+            asVersions = oProc.stdout.decode('utf-8', 'replace').splitlines();
+            if len(asVersions) == len(aoPkgLibs):
+                for oLib, sVer in zip(aoPkgLibs, asVersions):
+                    oLib.sPkgConfigVer = sVer.strip();
+            return;
+        sStdErr = oProc.stderr.decode('utf-8', 'replace');
+        aoPkgLibs = [ oLib for oLib in aoPkgLibs if f"'{oLib.sPkgConfigName}'" not in sStdErr \
+                                                and f' {oLib.sPkgConfigName} ' not in sStdErr ];
+
+def batchSyntaxCheckLibs(aoLibs):
+    """
+    Compiles all library probe sources with one -fsyntax-only driver call
+    (one per language), instead of one compiler spawn per library.
+
+    The per-file prefixes in the compiler output tell which probes failed
+    (usually a missing header); those skip their combined compile probe later
+    and go straight to the split stages for proper error reporting.  Purely
+    a pre-pass -- a wrong answer only costs the fallback path.
+    """
+    if  g_enmHostTarget == BuildTarget.WINDOWS \
+    or  g_fSlowProbes:
+        return;
+    mapGroups = { False: [], True: [] }; # Keyed by "is C++".
+    for oLib in aoLibs:
+        mapGroups[hasCPPHeader(oLib.asIncFiles)].append(oLib);
+    for fCPP, aoGroup in mapGroups.items():
+        sCompiler = g_oEnv['config_cpp_compiler'] if fCPP else g_oEnv['config_c_compiler'];
+        if  not sCompiler \
+        or  not aoGroup:
+            continue;
+        asFiles = [];
+        asIncPaths = [];
+        for oLib in aoGroup:
+            sFileSource = os.path.join(getProbeDir(), f'batch_{oLib.sName}' + ('.cpp' if fCPP else '.c'));
+            writeFileRaw(sFileSource, oLib.getTestCode());
+            asFiles.append(sFileSource);
+            asIncPaths.extend(oLib.asIncPaths + oLib.getIncSearchPaths());
+        asCmd = [ sCompiler, '-fsyntax-only' ] \
+              + [ f'-I{sIncPath}' for sIncPath in dict.fromkeys(asIncPaths) ] + asFiles;
+        try:
+            oProc = subprocess.run(asCmd, stdout = subprocess.PIPE, stderr = subprocess.PIPE, check = False, timeout = 60);
+        except (OSError, subprocess.SubprocessError) as ex:
+            printVerbose(1, f'Batched syntax check failed: {str(ex)}');
+            continue;
+        if oProc.returncode == 0:
+            for oLib in aoGroup:
+                oLib.fBatchSyntaxOk = True;
+        else:
+            sStdErr = oProc.stderr.decode('utf-8', 'replace');
+            for oLib, sFileSource in zip(aoGroup, asFiles):
+                oLib.fBatchSyntaxOk = os.path.basename(sFileSource) not in sStdErr;
+
+def runToolChecksThreaded(aoTools):
+    """
+    Runs independent tool checks concurrently in threads.
+
+    Only suitable for tools without a callback: those just block on
+    checkWhich's version subprocess and mutate their own instance fields, so
+    the waits overlap nicely.  Callback tools mutate g_oEnv in a defined
+    order and have to stay on the sequential path.
+
+    Returns False if any check failed, True otherwise.
+    """
+    if not aoTools:
+        return True;
+    with concurrent.futures.ThreadPoolExecutor(max_workers = min(len(aoTools), os.cpu_count() or 1)) as oExecutor:
+        afResults = list(oExecutor.map(lambda oTool: oTool.performCheck(), aoTools));
+    return all(fResult is not False for fResult in afResults);
+
 class SimpleTable:
     """
     A simple table for outputting aligned text.
@@ -2288,15 +3221,17 @@ class SimpleTable:
         Prints the table to the given file handle.
         """
 
-        # Compute maximum width for each column.
-        aRows = [self.asHeaders] + self.aRows;
-        aColWidths = [max(len(str(row[i])) for row in aRows) for i in range(len(self.asHeaders))];
-        sFmt = '  '.join('{{:<{}}}'.format(w) for w in aColWidths);
+        # Compute maximum width for each column; one zip pass over the
+        # (already stringified) cells instead of nested indexing with str().
+        aColWidths = [max(map(len, col)) for col in zip(self.asHeaders, *self.aRows)];
+        # str.ljust is a C-level call; no format mini-language re-parse per row.
+        def formatRow(asRow):
+            return '  '.join(sCell.ljust(cchWidth) for sCell, cchWidth in zip(asRow, aColWidths));
 
-        print(sFmt.format(*self.asHeaders));
+        print(formatRow(self.asHeaders));
         print('-' * (sum(aColWidths) + 2*(len(self.asHeaders)-1)));
         for row in self.aRows:
-            print(sFmt.format(*row));
+            print(formatRow(row));
 
 def print_targets(aeTargets):
     """
@@ -2312,7 +3247,7 @@ def show_syntax_help():
     """
     print("Supported libraries (with configure options):\n");
 
-    for oLibCur in g_aoLibs:
+    for oLibCur in getLibraryChecks():
         sDisable     = f"--disable-{oLibCur.sName}";
         sWith        = f"--with-{oLibCur.sName}-path=<path>";
         sOnlyTargets = f" (only on {print_targets(oLibCur.aeTargets)})" if oLibCur.aeTargets != [ BuildTarget.ANY ] else "";
@@ -2338,83 +3273,118 @@ Examples:
 Hint: Combine any supported --disable-<lib|tool> and --with-<lib>-path=PATH options.
 """);
 
-g_aoLibs = sorted([
-    LibraryCheck("softfloat", [ "softfloat.h", "iprt/cdefs.h" ], [ "libsoftfloat" ], [ BuildTarget.ANY ],
-                 '#define IN_RING3\n#include <softfloat.h>\nint main() { softfloat_state_t s; float32_t x, y; f32_add(x, y, &s); printf("<found>"); return 0; }\n'),
-    LibraryCheck("dxmt", [ "version.h" ], [ "libdxmt" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
-                '#include <version.h>\nint main() { return 0; }\n'),
-    LibraryCheck("dxvk", [ "dxvk/dxvk.h" ], [ "libdxvk" ],  [ BuildTarget.LINUX ],
-                 '#include <dxvk/dxvk.h>\nint main() { printf("<found>"); return 0; }\n'),
-    LibraryCheck("libalsa", [ "alsa/asoundlib.h" ], [ "libasound" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
-                 '#include <alsa/asoundlib.h>\n#include <alsa/version.h>\nint main() { snd_pcm_info_sizeof(); printf("%s", SND_LIB_VERSION_STR); return 0; }\n'),
-    LibraryCheck("libcap", [ "sys/capability.h" ], [ "libcap" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
-                 '#include <sys/capability.h>\nint main() { cap_t c = cap_init(); printf("<found>"); return 0; }\n'),
-    LibraryCheck("libcursor", [ "X11/cursorfont.h" ], [ "libXcursor" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
-                 '#include <X11/Xcursor/Xcursor.h>\nint main() { printf("%d.%d", XCURSOR_LIB_MAJOR, XCURSOR_LIB_MINOR); return 0; }\n'),
-    LibraryCheck("curl", [ "curl/curl.h" ], [ "libcurl" ], [ BuildTarget.ANY ],
-                 '#include <curl/curl.h>\nint main() { printf("%s", LIBCURL_VERSION); return 0; }\n'),
-    LibraryCheck("libdevmapper", [ "libdevmapper.h" ], [ "libdevmapper" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
-                 '#include <libdevmapper.h>\nint main() { char v[64]; dm_get_library_version(v, sizeof(v)); printf("%s", v); return 0; }\n'),
-    LibraryCheck("libgsoapssl++", [ "stdsoap2.h" ], [ "libgsoapssl++" ], [ BuildTarget.ANY ],
-                 '#include <stdsoap2.h>\nint main() { printf("%ld", GSOAP_VERSION); return 0; }\n'),
-    LibraryCheck("libjpeg-turbo", [ "turbojpeg.h" ], [ "libturbojpeg" ], [ BuildTarget.ANY ],
-                 '#include <turbojpeg.h>\nint main() { tjInitCompress(); printf("<found>"); return 0; }\n'),
-    LibraryCheck("liblzf", [ "lzf.h" ], [ "liblzf" ], [ BuildTarget.ANY ],
-                 '#include <liblzf/lzf.h>\nint main() { printf("%d.%d", LZF_VERSION >> 8, LZF_VERSION & 0xff);\n#if LZF_VERSION >= 0x0105\nreturn 0;\n#else\nreturn 1;\n#endif\n }\n'),
-    LibraryCheck("liblzma", [ "lzma.h" ], [ "liblzma" ], [ BuildTarget.ANY ],
-                 '#include <lzma.h>\nint main() { printf("%s", lzma_version_string()); return 0; }\n'),
-    LibraryCheck("libogg", [ "ogg/ogg.h" ], [ "libogg" ], [ BuildTarget.ANY ],
-                 '#include <ogg/ogg.h>\nint main() { oggpack_buffer o; oggpack_get_buffer(&o); printf("<found>"); return 0; }\n'),
-    LibraryCheck("libpam", [ "security/pam_appl.h" ], [ "libpam" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
-                 '#include <security/pam_appl.h>\nint main() { \n#ifdef __LINUX_PAM__\nprintf("%d.%d", __LINUX_PAM__, __LINUX_PAM_MINOR__); if (__LINUX_PAM__ >= 1) return 0;\n#endif\nreturn 1; }\n'),
-    LibraryCheck("libpng", [ "png.h" ], [ "libpng" ], [ BuildTarget.ANY ],
-                 '#include <png.h>\nint main() { printf("%s", PNG_LIBPNG_VER_STRING); return 0; }\n'),
-    LibraryCheck("libpthread", [ "pthread.h" ], [ "libpthread" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
-                 '#include <unistd.h>\n#include <pthread.h>\nint main() { \n#ifdef _POSIX_VERSION\nprintf("%d", (long)_POSIX_VERSION); return 0;\n#else\nreturn 1;\n#endif\n }\n'),
-    LibraryCheck("libpulse", [ "pulse/pulseaudio.h", "pulse/version.h" ], [ "libpulse" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
-                 '#include <pulse/version.h>\nint main() { printf("%s", pa_get_library_version()); return 0; }\n'),
-    LibraryCheck("libslirp", [ "slirp/libslirp.h", "slirp/libslirp-version.h" ], [ "libslirp" ], [ BuildTarget.ANY ],
-                 '#include <slirp/libslirp.h>\n#include <slirp/libslirp-version.h>\nint main() { printf("%d.%d.%d", SLIRP_MAJOR_VERSION, SLIRP_MINOR_VERSION, SLIRP_MICRO_VERSION); return 0; }\n'),
-    LibraryCheck("libssh", [ "libssh/libssh.h" ], [ "libssh" ], [ BuildTarget.ANY ],
-                 '#include <libssh/libssh.h>\n#include <libssh/libssh_version.h>\nint main() { printf("%d.%d.%d", LIBSSH_VERSION_MAJOR, LIBSSH_VERSION_MINOR, LIBSSH_VERSION_MICRO); return 0; }\n'),
-    LibraryCheck("libstdc++", [ "c++/11/iostream" ], [ ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
-                 "int main() { \n #ifdef __GLIBCXX__\nstd::cout << __GLIBCXX__;\n#elif defined(__GLIBCPP__)\nstd::cout << __GLIBCPP__;\n#else\nreturn 1\n#endif\nreturn 0; }\n"),
-    LibraryCheck("libtpms", [ "libtpms/tpm_library.h" ], [ "libtpms" ], [ BuildTarget.ANY ],
-                 '#include <libtpms/tpm_library.h>\nint main() { printf("%d.%d.%d", TPM_LIBRARY_VER_MAJOR, TPM_LIBRARY_VER_MINOR, TPM_LIBRARY_VER_MICRO); return 0; }\n'),
-    LibraryCheck("libvncserver", [ "rfb/rfb.h", "rfb/rfbclient.h" ], [ "libvncserver" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
-                 '#include <rfb/rfb.h>\nint main() { printf("%s", LIBVNCSERVER_PACKAGE_VERSION); return 0; }\n'),
-    LibraryCheck("libvorbis", [ "vorbis/vorbisenc.h" ], [ "libvorbis", "libvorbisenc" ], [ BuildTarget.ANY ],
-                 '#include <vorbis/vorbisenc.h>\nint main() { vorbis_info v; vorbis_info_init(&v); int vorbis_rc = vorbis_encode_init_vbr(&v, 2 /* channels */, 44100 /* hz */, (float).4 /* quality */); printf("<found>"); return 0; }\n'),
-    LibraryCheck("libvpx", [ "vpx/vpx_decoder.h" ], [ "libvpx" ], [ BuildTarget.ANY ],
-                 '#include <vpx/vpx_codec.h>\nint main() { printf("%s", vpx_codec_version_str()); return 0; }\n'),
-    LibraryCheck("libxml2", [ "libxml/parser.h" ] , [ "libxml2" ], [ BuildTarget.ANY ],
-                 '#include <libxml/xmlversion.h>\nint main() { printf("%s", LIBXML_DOTTED_VERSION); return 0; }\n'),
-    LibraryCheck("zlib", [ "zlib.h" ], [ "libz" ], [ BuildTarget.ANY ],
-                 '#include <zlib.h>\nint main() { printf("%s", ZLIB_VERSION); return 0; }\n'),
-    LibraryCheck("lwip", [ "lwip/init.h" ], [ "liblwip" ], [ BuildTarget.ANY ],
-                 '#include <lwip/init.h>\nint main() { printf("%d.%d.%d", LWIP_VERSION_MAJOR, LWIP_VERSION_MINOR, LWIP_VERSION_REVISION); return 0; }\n'),
-    LibraryCheck("opengl", [ "GL/gl.h" ], [ "libGL" ], [ BuildTarget.ANY ],
-                 '#include <GL/gl.h>\n#include <stdio.h>\nint main() { const GLubyte *s = glGetString(GL_VERSION); printf("%s", s ? (const char *)s : "<found>"); return 0; }\n'),
-    LibraryCheck("qt6", [ "QtGlobal" ], [ "QtCore" ], [ BuildTarget.ANY ],
-                 '#include <stdio.h>\n#include <QtGlobal>\nint main() { printf("%s", QT_VERSION_STR); }',
-                 asAltIncFiles = [ "qt/QtCore/QtGlobal" ], fnCallback = LibraryCheck.checkCallback_Qt6 ),
-    LibraryCheck("sdl2", [ "SDL2/SDL.h" ], [ "libSDL2" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
-                 '#include <SDL2/SDL.h>\nint main() { printf("%d.%d.%d", SDL_MAJOR_VERSION, SDL_MINOR_VERSION, SDL_PATCHLEVEL); return 0; }\n',
-                 asAltIncFiles = [ "SDL.h" ]),
-    LibraryCheck("sdl2_ttf", [ "SDL2/SDL_ttf.h" ], [ "libSDL2_ttf" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
-                 '#include <SDL2/SDL_ttf.h>\nint main() { printf("%d.%d.%d", SDL_TTF_MAJOR_VERSION, SDL_TTF_MINOR_VERSION, SDL_TTF_PATCHLEVEL); return 0; }\n',
-                 asAltIncFiles = [ "SDL_ttf.h" ]),
-    LibraryCheck("x11", [ "X11/Xlib.h" ], [ "libX11" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
-                 '#include <X11/Xlib.h>\nint main() { XOpenDisplay(NULL); printf("<found>"); return 0; }\n'),
-    LibraryCheck("xext", [ "X11/extensions/Xext.h" ], [ "libXext" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
-                 '#include <X11/Xlib.h>\n#include <X11/extensions/Xext.h>\nint main() { XSetExtensionErrorHandler(NULL); printf("<found>"); return 0; }\n'),
-    LibraryCheck("xmu", [ "X11/Xmu/Xmu.h" ], [ "libXmu" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
-                 '#include <X11/Xmu/Xmu.h>\nint main() { XmuMakeAtom("test"); printf("<found>"); return 0; }\n', aeTargetsExcluded=[ BuildTarget.DARWIN ]),
-    LibraryCheck("xrandr", [ "X11/extensions/Xrandr.h" ], [ "libXrandr", "libX11" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
-                 '#include <X11/Xlib.h>\n#include <X11/extensions/Xrandr.h>\nint main() { Display *dpy = XOpenDisplay(NULL); Window root = RootWindow(dpy, 0); XRRScreenConfiguration *c = XRRGetScreenInfo(dpy, root); printf("<found>"); return 0; }\n'),
-    LibraryCheck("libxinerama", [ "X11/extensions/Xinerama.h" ], [ "libXinerama", "libX11" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
-                 '#include <X11/Xlib.h>\n#include <X11/extensions/Xinerama.h>\nint main() { Display *dpy = XOpenDisplay(NULL); XineramaIsActive(dpy); printf("<found>"); return 0; }\n')
-], key=lambda l: l.sName);
+@functools.lru_cache(maxsize = 1)
+def getLibraryChecks():
+    """
+    Returns the sorted list of all library checks.
+
+    Constructed lazily on first use -- building three dozen LibraryCheck
+    objects with their test sources is dead weight for runs which never
+    reach the checks (--help and early argument errors).
+    """
+    return sorted([
+        LibraryCheck("softfloat", [ "softfloat.h", "iprt/cdefs.h" ], [ "libsoftfloat" ], [ BuildTarget.ANY ],
+                     '#define IN_RING3\n#include <softfloat.h>\nint main() { softfloat_state_t s; float32_t x, y; f32_add(x, y, &s); printf("<found>"); return 0; }\n'),
+        LibraryCheck("dxmt", [ "version.h" ], [ "libdxmt" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
+                    '#include <version.h>\nint main() { return 0; }\n'),
+        LibraryCheck("dxvk", [ "dxvk/dxvk.h" ], [ "libdxvk" ],  [ BuildTarget.LINUX ],
+                     '#include <dxvk/dxvk.h>\nint main() { printf("<found>"); return 0; }\n'),
+        LibraryCheck("libalsa", [ "alsa/asoundlib.h" ], [ "libasound" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
+                     '#include <alsa/asoundlib.h>\n#include <alsa/version.h>\nint main() { snd_pcm_info_sizeof(); printf("%s", SND_LIB_VERSION_STR); return 0; }\n',
+                     sPkgConfigName = 'alsa'),
+        LibraryCheck("libcap", [ "sys/capability.h" ], [ "libcap" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
+                     '#include <sys/capability.h>\nint main() { cap_t c = cap_init(); printf("<found>"); return 0; }\n',
+                     sPkgConfigName = 'libcap'),
+        LibraryCheck("libcursor", [ "X11/cursorfont.h" ], [ "libXcursor" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
+                     '#include <X11/Xcursor/Xcursor.h>\nint main() { printf("%d.%d", XCURSOR_LIB_MAJOR, XCURSOR_LIB_MINOR); return 0; }\n'),
+        LibraryCheck("curl", [ "curl/curl.h" ], [ "libcurl" ], [ BuildTarget.ANY ],
+                     '#include <curl/curl.h>\nint main() { printf("%s", LIBCURL_VERSION); return 0; }\n',
+                     sVersionMacro = 'LIBCURL_VERSION', sPkgConfigName = 'libcurl'),
+        LibraryCheck("libdevmapper", [ "libdevmapper.h" ], [ "libdevmapper" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
+                     '#include <libdevmapper.h>\nint main() { char v[64]; dm_get_library_version(v, sizeof(v)); printf("%s", v); return 0; }\n',
+                     sPkgConfigName = 'devmapper'),
+        LibraryCheck("libgsoapssl++", [ "stdsoap2.h" ], [ "libgsoapssl++" ], [ BuildTarget.ANY ],
+                     '#include <stdsoap2.h>\nint main() { printf("%ld", GSOAP_VERSION); return 0; }\n',
+                     sVersionMacro = ( 'GSOAP_VERSION', )),
+        LibraryCheck("libjpeg-turbo", [ "turbojpeg.h" ], [ "libturbojpeg" ], [ BuildTarget.ANY ],
+                     '#include <turbojpeg.h>\nint main() { tjInitCompress(); printf("<found>"); return 0; }\n',
+                     sPkgConfigName = 'libturbojpeg'),
+        LibraryCheck("liblzf", [ "lzf.h" ], [ "liblzf" ], [ BuildTarget.ANY ],
+                     '#include <liblzf/lzf.h>\nint main() { printf("%d.%d", LZF_VERSION >> 8, LZF_VERSION & 0xff);\n#if LZF_VERSION >= 0x0105\nreturn 0;\n#else\nreturn 1;\n#endif\n }\n'),
+        LibraryCheck("liblzma", [ "lzma.h" ], [ "liblzma" ], [ BuildTarget.ANY ],
+                     '#include <lzma.h>\nint main() { printf("%s", lzma_version_string()); return 0; }\n',
+                     sPkgConfigName = 'liblzma'),
+        LibraryCheck("libogg", [ "ogg/ogg.h" ], [ "libogg" ], [ BuildTarget.ANY ],
+                     '#include <ogg/ogg.h>\nint main() { oggpack_buffer o; oggpack_get_buffer(&o); printf("<found>"); return 0; }\n',
+                     sPkgConfigName = 'ogg'),
+        LibraryCheck("libpam", [ "security/pam_appl.h" ], [ "libpam" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
+                     '#include <security/pam_appl.h>\nint main() { \n#ifdef __LINUX_PAM__\nprintf("%d.%d", __LINUX_PAM__, __LINUX_PAM_MINOR__); if (__LINUX_PAM__ >= 1) return 0;\n#endif\nreturn 1; }\n'),
+        LibraryCheck("libpng", [ "png.h" ], [ "libpng" ], [ BuildTarget.ANY ],
+                     '#include <png.h>\nint main() { printf("%s", PNG_LIBPNG_VER_STRING); return 0; }\n',
+                     sVersionMacro = 'PNG_LIBPNG_VER_STRING', sPkgConfigName = 'libpng'),
+        LibraryCheck("libpthread", [ "pthread.h" ], [ "libpthread" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
+                     '#include <unistd.h>\n#include <pthread.h>\nint main() { \n#ifdef _POSIX_VERSION\nprintf("%d", (long)_POSIX_VERSION); return 0;\n#else\nreturn 1;\n#endif\n }\n'),
+        LibraryCheck("libpulse", [ "pulse/pulseaudio.h", "pulse/version.h" ], [ "libpulse" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
+                     '#include <pulse/version.h>\nint main() { printf("%s", pa_get_library_version()); return 0; }\n',
+                     sPkgConfigName = 'libpulse'),
+        LibraryCheck("libslirp", [ "slirp/libslirp.h", "slirp/libslirp-version.h" ], [ "libslirp" ], [ BuildTarget.ANY ],
+                     '#include <slirp/libslirp.h>\n#include <slirp/libslirp-version.h>\nint main() { printf("%d.%d.%d", SLIRP_MAJOR_VERSION, SLIRP_MINOR_VERSION, SLIRP_MICRO_VERSION); return 0; }\n',
+                     sVersionMacro = ( 'SLIRP_MAJOR_VERSION', 'SLIRP_MINOR_VERSION', 'SLIRP_MICRO_VERSION' ), sPkgConfigName = 'slirp'),
+        LibraryCheck("libssh", [ "libssh/libssh.h" ], [ "libssh" ], [ BuildTarget.ANY ],
+                     '#include <libssh/libssh.h>\n#include <libssh/libssh_version.h>\nint main() { printf("%d.%d.%d", LIBSSH_VERSION_MAJOR, LIBSSH_VERSION_MINOR, LIBSSH_VERSION_MICRO); return 0; }\n',
+                     sVersionMacro = ( 'LIBSSH_VERSION_MAJOR', 'LIBSSH_VERSION_MINOR', 'LIBSSH_VERSION_MICRO' ), sPkgConfigName = 'libssh'),
+        LibraryCheck("libstdc++", [ "c++/11/iostream" ], [ ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
+                     "int main() { \n #ifdef __GLIBCXX__\nstd::cout << __GLIBCXX__;\n#elif defined(__GLIBCPP__)\nstd::cout << __GLIBCPP__;\n#else\nreturn 1\n#endif\nreturn 0; }\n"),
+        LibraryCheck("libtpms", [ "libtpms/tpm_library.h" ], [ "libtpms" ], [ BuildTarget.ANY ],
+                     '#include <libtpms/tpm_library.h>\nint main() { printf("%d.%d.%d", TPM_LIBRARY_VER_MAJOR, TPM_LIBRARY_VER_MINOR, TPM_LIBRARY_VER_MICRO); return 0; }\n',
+                     sVersionMacro = ( 'TPM_LIBRARY_VER_MAJOR', 'TPM_LIBRARY_VER_MINOR', 'TPM_LIBRARY_VER_MICRO' ), sPkgConfigName = 'libtpms'),
+        LibraryCheck("libvncserver", [ "rfb/rfb.h", "rfb/rfbclient.h" ], [ "libvncserver" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
+                     '#include <rfb/rfb.h>\nint main() { printf("%s", LIBVNCSERVER_PACKAGE_VERSION); return 0; }\n',
+                     sVersionMacro = 'LIBVNCSERVER_PACKAGE_VERSION', sPkgConfigName = 'libvncserver'),
+        LibraryCheck("libvorbis", [ "vorbis/vorbisenc.h" ], [ "libvorbis", "libvorbisenc" ], [ BuildTarget.ANY ],
+                     '#include <vorbis/vorbisenc.h>\nint main() { vorbis_info v; vorbis_info_init(&v); int vorbis_rc = vorbis_encode_init_vbr(&v, 2 /* channels */, 44100 /* hz */, (float).4 /* quality */); printf("<found>"); return 0; }\n',
+                     sPkgConfigName = 'vorbisenc'),
+        LibraryCheck("libvpx", [ "vpx/vpx_decoder.h" ], [ "libvpx" ], [ BuildTarget.ANY ],
+                     '#include <vpx/vpx_codec.h>\nint main() { printf("%s", vpx_codec_version_str()); return 0; }\n',
+                     sPkgConfigName = 'vpx'),
+        LibraryCheck("libxml2", [ "libxml/parser.h" ] , [ "libxml2" ], [ BuildTarget.ANY ],
+                     '#include <libxml/xmlversion.h>\nint main() { printf("%s", LIBXML_DOTTED_VERSION); return 0; }\n',
+                     sVersionMacro = 'LIBXML_DOTTED_VERSION', sPkgConfigName = 'libxml-2.0'),
+        LibraryCheck("zlib", [ "zlib.h" ], [ "libz" ], [ BuildTarget.ANY ],
+                     '#include <zlib.h>\nint main() { printf("%s", ZLIB_VERSION); return 0; }\n',
+                     sVersionMacro = 'ZLIB_VERSION', sPkgConfigName = 'zlib'),
+        LibraryCheck("lwip", [ "lwip/init.h" ], [ "liblwip" ], [ BuildTarget.ANY ],
+                     '#include <lwip/init.h>\nint main() { printf("%d.%d.%d", LWIP_VERSION_MAJOR, LWIP_VERSION_MINOR, LWIP_VERSION_REVISION); return 0; }\n',
+                     sVersionMacro = ( 'LWIP_VERSION_MAJOR', 'LWIP_VERSION_MINOR', 'LWIP_VERSION_REVISION' )),
+        LibraryCheck("opengl", [ "GL/gl.h" ], [ "libGL" ], [ BuildTarget.ANY ],
+                     '#include <GL/gl.h>\n#include <stdio.h>\nint main() { const GLubyte *s = glGetString(GL_VERSION); printf("%s", s ? (const char *)s : "<found>"); return 0; }\n'),
+        LibraryCheck("qt6", [ "QtGlobal" ], [ "QtCore" ], [ BuildTarget.ANY ],
+                     '#include <stdio.h>\n#include <QtGlobal>\nint main() { printf("%s", QT_VERSION_STR); }',
+                     asAltIncFiles = [ "qt/QtCore/QtGlobal" ], fnCallback = LibraryCheck.checkCallback_Qt6 ),
+        LibraryCheck("sdl2", [ "SDL2/SDL.h" ], [ "libSDL2" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
+                     '#include <SDL2/SDL.h>\nint main() { printf("%d.%d.%d", SDL_MAJOR_VERSION, SDL_MINOR_VERSION, SDL_PATCHLEVEL); return 0; }\n',
+                     sVersionMacro = ( 'SDL_MAJOR_VERSION', 'SDL_MINOR_VERSION', 'SDL_PATCHLEVEL' ), sPkgConfigName = 'sdl2',
+                     asAltIncFiles = [ "SDL.h" ]),
+        LibraryCheck("sdl2_ttf", [ "SDL2/SDL_ttf.h" ], [ "libSDL2_ttf" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
+                     '#include <SDL2/SDL_ttf.h>\nint main() { printf("%d.%d.%d", SDL_TTF_MAJOR_VERSION, SDL_TTF_MINOR_VERSION, SDL_TTF_PATCHLEVEL); return 0; }\n',
+                     sPkgConfigName = 'SDL2_ttf',
+                     asAltIncFiles = [ "SDL_ttf.h" ]),
+        LibraryCheck("x11", [ "X11/Xlib.h" ], [ "libX11" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
+                     '#include <X11/Xlib.h>\nint main() { XOpenDisplay(NULL); printf("<found>"); return 0; }\n',
+                     sPkgConfigName = 'x11'),
+        LibraryCheck("xext", [ "X11/extensions/Xext.h" ], [ "libXext" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
+                     '#include <X11/Xlib.h>\n#include <X11/extensions/Xext.h>\nint main() { XSetExtensionErrorHandler(NULL); printf("<found>"); return 0; }\n',
+                     sPkgConfigName = 'xext'),
+        LibraryCheck("xmu", [ "X11/Xmu/Xmu.h" ], [ "libXmu" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
+                     '#include <X11/Xmu/Xmu.h>\nint main() { XmuMakeAtom("test"); printf("<found>"); return 0; }\n', aeTargetsExcluded=[ BuildTarget.DARWIN ],
+                     sPkgConfigName = 'xmu'),
+        LibraryCheck("xrandr", [ "X11/extensions/Xrandr.h" ], [ "libXrandr", "libX11" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
+                     '#include <X11/Xlib.h>\n#include <X11/extensions/Xrandr.h>\nint main() { Display *dpy = XOpenDisplay(NULL); Window root = RootWindow(dpy, 0); XRRScreenConfiguration *c = XRRGetScreenInfo(dpy, root); printf("<found>"); return 0; }\n',
+                     sPkgConfigName = 'xrandr'),
+        LibraryCheck("libxinerama", [ "X11/extensions/Xinerama.h" ], [ "libXinerama", "libX11" ], [ BuildTarget.LINUX, BuildTarget.SOLARIS, BuildTarget.BSD ],
+                     '#include <X11/Xlib.h>\n#include <X11/extensions/Xinerama.h>\nint main() { Display *dpy = XOpenDisplay(NULL); XineramaIsActive(dpy); printf("<found>"); return 0; }\n',
+                     sPkgConfigName = 'xinerama')
+    ], key = lambda l: l.sName);
 
 # Note: The order is important here for subsequent checks.
 #       Don't change without proper testing!
@@ -2453,8 +3423,10 @@ def write_autoconfig_kmk(sFilePath, enmBuildTarget, oEnv, aoLibs, aoTools):
     _ = enmBuildTarget, aoTools; # Unused for now.
 
     try:
-        with open(sFilePath, "w", encoding = "utf-8") as fh:
-            fh.write(f"""
+        # Assemble everything in memory first (StringIO appends in C); the
+        # file is then written with a single call instead of one per line.
+        oBuf = io.StringIO();
+        oBuf.write(f"""
 # -*- Makefile -*-
 #
 # Automatically generated by
@@ -2467,23 +3439,25 @@ def write_autoconfig_kmk(sFilePath, enmBuildTarget, oEnv, aoLibs, aoTools):
 # Generated on """ + datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S") + """
 #
 \n""");
-            oEnv.write_all(fh, asPrefixInclude = ['VBOX_', 'PATH_TOOL_' ]);
-            fh.write('\n');
-
-            for oLibCur in aoLibs:
-                sVarBase = oLibCur.sName.upper().replace("+", "PLUS").replace("-", "_");
-                sEnabled = '1' if oLibCur.fHave else '';
-                fh.write(f"VBOX_WITH_{sVarBase}={sEnabled}\n");
-                if oLibCur.fHave and (oLibCur.asLibPaths or oLibCur.asIncPaths):
-                    if oLibCur.asLibPaths:
-                        g_oEnv.write_single(fh, f'SDK_{sVarBase}_LIBS', oLibCur.asLibPaths[0]);
-                    if oLibCur.asIncPaths:
-                        g_oEnv.write_single(fh, f'SDK_{sVarBase}_INCS', oLibCur.asIncPaths[0]);
-
-            g_oEnv.write_single(fh, 'PATH_SDK_WINSDK10');
-            g_oEnv.write_single(fh, 'SDK_WINSDK10_VERSION');
-            g_oEnv.write_single(fh, 'PATH_SDK_WINDDK71');
-            g_oEnv.write_single(fh, 'SDK_WINDDK71_VERSION'); # Not official, but good to have (I guess).
+        oEnv.write_all(oBuf, asPrefixInclude = ['VBOX_', 'PATH_TOOL_' ]);
+        oBuf.write('\n');
+
+        for oLibCur in aoLibs:
+            sVarBase = oLibCur.sVarBase;
+            sEnabled = '1' if oLibCur.fHave else '';
+            oBuf.write(f"VBOX_WITH_{sVarBase}={sEnabled}\n");
+            if oLibCur.fHave and (oLibCur.asLibPaths or oLibCur.asIncPaths):
+                if oLibCur.asLibPaths:
+                    g_oEnv.write_single(oBuf, f'SDK_{sVarBase}_LIBS', oLibCur.asLibPaths[0]);
+                if oLibCur.asIncPaths:
+                    g_oEnv.write_single(oBuf, f'SDK_{sVarBase}_INCS', oLibCur.asIncPaths[0]);
+
+        g_oEnv.write_single(oBuf, 'PATH_SDK_WINSDK10');
+        g_oEnv.write_single(oBuf, 'SDK_WINSDK10_VERSION');
+        g_oEnv.write_single(oBuf, 'PATH_SDK_WINDDK71');
+        g_oEnv.write_single(oBuf, 'SDK_WINDDK71_VERSION'); # Not official, but good to have (I guess).
+
+        writeFileIfChanged(sFilePath, oBuf.getvalue());
 
         return True;
     except OSError as ex:
@@ -2498,11 +3472,12 @@ def write_env(sFilePath, enmBuildTarget, enmBuildArch, oEnv, aoLibs, aoTools):
     _ = aoLibs, aoTools; # Unused for now.
 
     try:
-        with open(sFilePath, "w", encoding = "utf-8") as fh:
-            sTimestamp  = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S");
-            sScriptArgs = ' '.join(sys.argv[1:]);
-            if g_enmHostTarget != BuildTarget.WINDOWS:
-                fh.write(f"""
+        # Same single-write scheme as write_autoconfig_kmk.
+        oBuf        = io.StringIO();
+        sTimestamp  = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S");
+        sScriptArgs = ' '.join(sys.argv[1:]);
+        if g_enmHostTarget != BuildTarget.WINDOWS:
+            oBuf.write(f"""
 #!/bin/bash
 # -*- Environment -*-
 #
@@ -2515,8 +3490,8 @@ def write_env(sFilePath, enmBuildTarget, enmBuildArch, oEnv, aoLibs, aoTools):
 #
 # Generated on """ + sTimestamp + """
 #\n""");
-            else: # non-Windows.
-                fh.write(f"""
+        else: # non-Windows.
+            oBuf.write(f"""
 @echo off
 rem -*- Environment -*-
 rem
@@ -2529,20 +3504,116 @@ rem It will be completely overwritten if {g_sScriptName} is executed again.
 rem
 rem Generated on """ +  sTimestamp + """
 rem\n""");
-            oEnv.write_all_as_exports(fh, enmBuildTarget, asPrefixInclude = [ 'KBUILD_' ]);
-            sPath = oEnv['PATH_OUT_BASE'];
-            if sPath:
-                fh.write(f'PATH_OUT_BASE={sPath}\n');
-                fh.write( 'set PATH_OUT_BASE\n');
+        oEnv.write_all_as_exports(oBuf, enmBuildTarget, asPrefixInclude = [ 'KBUILD_' ]);
+        sPath = oEnv['PATH_OUT_BASE'];
+        if sPath:
+            oBuf.write(f'PATH_OUT_BASE={sPath}\n');
+            oBuf.write( 'set PATH_OUT_BASE\n');
 
-            oEnv.prependPath('PATH', os.path.join(g_sScriptPath, g_oEnv['KBUILD_PATH'], 'bin', f'{enmBuildTarget}.{enmBuildArch}'));
-            oEnv.write_as_export(fh, 'PATH', enmBuildTarget);
+        oEnv.prependPath('PATH', os.path.join(g_sScriptPath, g_oEnv['KBUILD_PATH'], 'bin', f'{enmBuildTarget}.{enmBuildArch}'));
+        oEnv.write_as_export(oBuf, 'PATH', enmBuildTarget);
+
+        writeFileIfChanged(sFilePath, oBuf.getvalue());
 
         return True;
     except OSError as ex:
         printError(f"Failed to write environment file to {sFilePath}: {str(ex)}");
     return False;
 
+def applyEnvTransforms(oEnv):
+    """
+    Applies the dependent environment variable transformations.
+
+    This is needed to set/unset/change other environment variables on already
+    set ones.  For instance, building OSE requires certain components to be
+    disabled.  Same when a certain library gets disabled.
+
+    Straight-line code with the frequently tested variables read once and all
+    updates collected into a single dict.
+    """
+    fOnlyAdditions = oEnv['VBOX_ONLY_ADDITIONS'];
+    sOse           = oEnv['VBOX_OSE'];
+    mapUpdates     = {};
+
+    #
+    # Generic
+    #
+    # Disabling building the docs when only building Additions or explicitly disabled building the docs.
+    if fOnlyAdditions or oEnv['VBOX_WITH_DOCS'] == '':
+        mapUpdates['VBOX_WITH_DOCS_PACKING'] = '';
+    # Disable building the ExtPack VNC when only building Additions or OSE.
+    if fOnlyAdditions or sOse == '1':
+        mapUpdates['VBOX_WITH_EXTPACK_VNC'] = '';
+    if fOnlyAdditions:
+        mapUpdates['VBOX_WITH_WEBSERVICES'] = '';
+        mapUpdates['VBOX_WITH_EXTPACK_PUEL_BUILD'] = '';
+    # Disable stuff which aren't available in OSE.
+    if sOse:
+        mapUpdates['VBOX_WITH_VALIDATIONKIT'] = '';
+        mapUpdates['VBOX_WITH_WIN32_ADDITIONS'] = '';
+    # Disable FE/Qt if qt6 is disabled.
+    if oEnv['config_libs_disable_qt6']:
+        mapUpdates['VBOX_WITH_QTGUI'] = '';
+    # Disable components if we want to build headless.
+    if oEnv['config_build_headless']:
+        mapUpdates.update({ 'VBOX_WITH_HEADLESS': '1', \
+                            'VBOX_WITH_QTGUI': '', \
+                            'VBOX_WITH_SECURELABEL': '', \
+                            'VBOX_WITH_VMSVGA3D': '', \
+                            'VBOX_WITH_3D_ACCELERATION' : '', \
+                            'VBOX_GUI_USE_QGL' : '' });
+    # Disable recording if libvpx is disabled.
+    if oEnv['config_libs_disable_libvpx']:
+        mapUpdates.update({ 'VBOX_WITH_LIBVPX': '', \
+                            'VBOX_WITH_RECORDING': '' });
+    # Disable audio recording if libvpx is disabled.
+    if  oEnv['config_libs_disable_libogg'] \
+    and oEnv['config_libs_disable_libvorbis']:
+        mapUpdates.update({ 'VBOX_WITH_LIBOGG': '', \
+                            'VBOX_WITH_LIBVORBIS': '', \
+                            'VBOX_WITH_AUDIO_RECORDING': '' });
+    # Disable building webservices if GSOAP is disabled.
+    if  oEnv['config_tools_disable_gsoap'] \
+    or  oEnv['config_libs_disable_libgsoapssl++']:
+        mapUpdates.update({ 'VBOX_WITH_GSOAP': '', \
+                            'VBOX_WITH_WEBSERVICES': '' });
+    # Disable components which require COM.
+    if oEnv['config_disable_com']:
+        mapUpdates.update({ 'VBOX_WITH_MAIN': '', \
+                            'VBOX_WITH_QTGUI': '', \
+                            'VBOX_WITH_VBOXSDL': '', \
+                            'VBOX_WITH_DEBUGGER_GUI': '' });
+    # Disable components which require Java.
+    if oEnv['config_disable_java']:
+        mapUpdates.update({ 'VBOX_WITH_JXPCOM': '', \
+                            'VBOX_WITH_JWS': '', \
+                            'VBOX_WITH_JMSCOM': '' });
+    # Disable components which require Python.
+    if oEnv['config_disable_python']:
+        mapUpdates['VBOX_WITH_PYTHON'] = '';
+
+    #
+    # Windows
+    #
+    if oEnv['config_win_ddk_path']:
+        mapUpdates['VBOX_PATH_WIN_DDK_ROOT'] = oEnv['config_win_ddk_path'];
+    if oEnv['config_win_sdk_path']:
+        mapUpdates['VBOX_PATH_WIN_SDK_ROOT'] = oEnv['config_win_sdk_path'];
+    if oEnv['config_win_sdk10_path']:
+        mapUpdates['VBOX_PATH_WIN_SDK10_ROOT'] = oEnv['config_win_sdk10_path'];
+    # Note: Pre-defined environment variable by vcpkg. Do not change.
+    if oEnv['config_win_vcpkg_root']:
+        mapUpdates['VCPKG_ROOT'] = oEnv['config_win_vcpkg_root'];
+
+    #
+    # macOS
+    #
+    # Sets the macOS SDK path.
+    if oEnv['config_macos_sdk_path']:
+        mapUpdates['VBOX_PATH_MACOSX_SDK_ROOT'] = oEnv['config_macos_sdk_path'];
+
+    oEnv.env.update(mapUpdates);
+
 def main():
     """
     Main entry point.
@@ -2551,6 +3622,7 @@ def main():
     global g_fCompatMode
     global g_fDebug;
     global g_fContOnErr;
+    global g_fSlowProbes;
     global g_sFileLog;
     global g_sDevBinPath;
 
@@ -2566,7 +3638,7 @@ def main():
     oParser.add_argument('-h', '--help', help="Displays this help", action='store_true');
     oParser.add_argument('-v', '--verbose', help="Enables verbose output", action='count', default=0, dest='config_verbose');
     oParser.add_argument('-V', '--version', help="Prints the version of this script", action='store_true');
-    for oLibCur in g_aoLibs:
+    for oLibCur in getLibraryChecks():
         oParser.add_argument(f'--disable-{oLibCur.sName}', f'--without-{oLibCur.sName}', action='store_true', default=None, dest=f'config_libs_disable_{oLibCur.sName}');
         oParser.add_argument(f'--with-{oLibCur.sName}-path', dest=f'config_libs_path_{oLibCur.sName}');
         # For debugging / development only. We don't expose this in the syntax help.
@@ -2591,6 +3663,10 @@ def main():
     oParser.add_argument('--file-env', help='Path to output env[.bat|.sh] file', action='store_true', \
                          default='env.bat' if g_enmHostTarget == BuildTarget.WINDOWS else 'env.sh', dest='config_file_env');
     oParser.add_argument('--file-log', help='Path to output log file', action='store_true', default='configure.log', dest='config_file_log');
+    oParser.add_argument('--config-cache', help='Path to the probe results cache file', \
+                         default=os.path.join(g_sOutPath, 'configure.cache'), dest='config_cache_file');
+    oParser.add_argument('--no-config-cache', help='Disables reading/writing the probe results cache', action='store_true', default=False, dest='config_cache_disable');
+    oParser.add_argument('--slow-probes', help='Forces the split header/lib/compile probe stages. Only use for debugging', action='store_true', default=False, dest='config_slow_probes');
     oParser.add_argument('--only-additions', help='Only build Guest Additions related libraries and tools', action='store_true', default=None, dest='VBOX_ONLY_ADDITIONS=');
     oParser.add_argument('--only-docs', help='Only build the documentation', action='store_true', default=None, dest='VBOX_ONLY_DOCS=1');
     oParser.add_argument('--path-devtools', help='Specifies the devtools directory', default=None, dest='config_path_devtools');
@@ -2636,6 +3712,10 @@ def main():
         print('Invalid argument(s) -- try --help for more information.');
         return 2;
 
+    # The parsed options as a plain dict; saves the constructed-name getattr
+    # reflection in the filter passes below.
+    mapArgs = vars(oArgs);
+
     if oArgs.help:
         show_syntax_help();
         return 2;
@@ -2654,8 +3734,13 @@ def main():
         g_fCompatMode = oArgs.config_compat;
     g_fDebug = oArgs.config_debug;
     g_fContOnErr = oArgs.config_nofatal;
+    g_fSlowProbes = oArgs.config_slow_probes;
     g_sFileLog = oArgs.config_file_log;
 
+    # Load the probe cache (if enabled) so repeated configure runs can skip expensive probes.
+    g_oProbeCache.fEnabled = not oArgs.config_cache_disable;
+    g_oProbeCache.load(oArgs.config_cache_file);
+
     # Set defaults.
     g_oEnv.set('KBUILD_HOST', g_enmHostTarget);
     g_oEnv.set('KBUILD_HOST_ARCH', g_enmHostArch);
@@ -2666,7 +3751,7 @@ def main():
     g_oEnv.set('KBUILD_PATH', oArgs.config_tools_path_kbuild);
     g_oEnv.set('VBOX_WITH_HARDENING', '1');
     g_oEnv.set('PATH_OUT_BASE', oArgs.config_path_out_base);
-    if getattr(oArgs, 'config_path_devtools'):
+    if oArgs.config_path_devtools:
         g_oEnv.set('PATH_DEVTOOLS', oArgs.config_path_devtools);
     else:
         g_oEnv.set('PATH_DEVTOOLS', os.path.join(g_sScriptPath, 'tools', g_oEnv['KBUILD_TARGET'] + '.' + g_oEnv['KBUILD_TARGET_ARCH']));
@@ -2675,24 +3760,24 @@ def main():
 
     # Handle prepending / appending certain paths ('--[prepend|append]-<whatever>-path') arguments.
     for sArgCur, _ in g_asPathsPrepend.items(): # ASSUMES that g_asPathsAppend and g_asPathsPrepend are in sync.
-        sPath = getattr(oArgs, f'config_path_append_{sArgCur}');
+        sPath = mapArgs[f'config_path_append_{sArgCur}'];
         if sPath:
             g_asPathsAppend[ sArgCur ].extend( [ sPath ] );
-        sPath = getattr(oArgs, f'config_path_prepend_{sArgCur}');
+        sPath = mapArgs[f'config_path_prepend_{sArgCur}'];
         if sPath:
             g_asPathsPrepend[ sArgCur ].extend( [ sPath ] );
 
-    if getattr(oArgs, 'config_python_path'):
-        oArgs.config_libs_path_python_c_api = getattr(oArgs, 'config_python_path');
+    if oArgs.config_python_path:
+        oArgs.config_libs_path_python_c_api = oArgs.config_python_path;
 
     # Apply updates from command line arguments.
     g_oEnv.updateFromArgs(oArgs);
 
     # Filter libs and tools based on --only-XXX flags.
     # Replace '-' with '_' so that we can use variables directly w/o getattr lateron.
-    aoOnlyLibs = [lib for lib in g_aoLibs if getattr(oArgs, f'config_libs_only_{lib.sName.replace("-", "_")}', False)];
-    aoOnlyTools = [tool for tool in g_aoTools if getattr(oArgs, f'config_tools_only_{tool.sName.replace("-", "_")}', False)];
-    aoLibsToCheck = aoOnlyLibs if aoOnlyLibs else g_aoLibs;
+    aoOnlyLibs = [lib for lib in getLibraryChecks() if mapArgs.get(f'config_libs_only_{lib.sName.replace("-", "_")}')];
+    aoOnlyTools = [tool for tool in g_aoTools if mapArgs.get(f'config_tools_only_{tool.sName.replace("-", "_")}')];
+    aoLibsToCheck = aoOnlyLibs if aoOnlyLibs else getLibraryChecks();
     aoToolsToCheck = aoOnlyTools if aoOnlyTools else g_aoTools;
     # Filter libs and tools based on build target.
     aoLibsToCheck  = [lib for lib in aoLibsToCheck if g_oEnv['KBUILD_TARGET'] in lib.aeTargets or BuildTarget.ANY in lib.aeTargets];
@@ -2730,69 +3815,7 @@ def main():
     #
     # Handle environment variable transformations.
     #
-    # This is needed to set/unset/change other environment variables on already set ones.
-    # For instance, building OSE requires certain components to be disabled. Same when a certain library gets disabled.
-    #
-    envTransforms = [
-        #
-        # Generic
-        #
-        # Disabling building the docs when only building Additions or explicitly disabled building the docs.
-        lambda env: { 'VBOX_WITH_DOCS_PACKING': ''} if g_oEnv['VBOX_ONLY_ADDITIONS'] or g_oEnv['VBOX_WITH_DOCS'] == '' else {},
-        # Disable building the ExtPack VNC when only building Additions or OSE.
-        lambda env: { 'VBOX_WITH_EXTPACK_VNC': '' } if g_oEnv['VBOX_ONLY_ADDITIONS'] or g_oEnv['VBOX_OSE'] == '1' else {},
-        lambda env: { 'VBOX_WITH_WEBSERVICES': '' } if g_oEnv['VBOX_ONLY_ADDITIONS'] else {},
-        # Disable stuff which aren't available in OSE.
-        lambda env: { 'VBOX_WITH_VALIDATIONKIT': '' , 'VBOX_WITH_WIN32_ADDITIONS': '' } if g_oEnv['VBOX_OSE'] else {},
-        lambda env: { 'VBOX_WITH_EXTPACK_PUEL_BUILD': '' } if g_oEnv['VBOX_ONLY_ADDITIONS'] else {},
-        # Disable FE/Qt if qt6 is disabled.
-        lambda env: { 'VBOX_WITH_QTGUI': '' } if g_oEnv['config_libs_disable_qt6'] else {},
-        # Disable components if we want to build headless.
-        lambda env: { 'VBOX_WITH_HEADLESS': '1', \
-                      'VBOX_WITH_QTGUI': '', \
-                      'VBOX_WITH_SECURELABEL': '', \
-                      'VBOX_WITH_VMSVGA3D': '', \
-                      'VBOX_WITH_3D_ACCELERATION' : '', \
-                      'VBOX_GUI_USE_QGL' : '' } if g_oEnv['config_build_headless'] else {},
-        # Disable recording if libvpx is disabled.
-        lambda env: { 'VBOX_WITH_LIBVPX': '', \
-                      'VBOX_WITH_RECORDING': '' } if g_oEnv['config_libs_disable_libvpx'] else {},
-        # Disable audio recording if libvpx is disabled.
-        lambda env: { 'VBOX_WITH_LIBOGG': '', \
-                      'VBOX_WITH_LIBVORBIS': '', \
-                      'VBOX_WITH_AUDIO_RECORDING': '' } if  g_oEnv['config_libs_disable_libogg'] \
-                                                        and g_oEnv['config_libs_disable_libvorbis'] else {},
-        # Disable building webservices if GSOAP is disabled.
-        lambda env: { 'VBOX_WITH_GSOAP': '', \
-                      'VBOX_WITH_WEBSERVICES': '' } if g_oEnv['config_tools_disable_gsoap'] \
-                                                    or g_oEnv['config_libs_disable_libgsoapssl++'] else {},
-        # Disable components which require COM.
-        lambda env: { 'VBOX_WITH_MAIN': '', \
-                      'VBOX_WITH_QTGUI': '', \
-                      'VBOX_WITH_VBOXSDL': '', \
-                      'VBOX_WITH_DEBUGGER_GUI': '' } if g_oEnv['config_disable_com'] else {},
-        # Disable components which require Java.
-        lambda env: { 'VBOX_WITH_JXPCOM': '', \
-                      'VBOX_WITH_JWS': '', \
-                      'VBOX_WITH_JMSCOM': '' } if g_oEnv['config_disable_java'] else {},
-        # Disable components which require Python.
-        lambda env: { 'VBOX_WITH_PYTHON': '' } if g_oEnv['config_disable_python'] else {},
-        #
-        # Windows
-        #
-        lambda env: { 'VBOX_PATH_WIN_DDK_ROOT': g_oEnv['config_win_ddk_path'] } if g_oEnv['config_win_ddk_path'] else {},
-        lambda env: { 'VBOX_PATH_WIN_SDK_ROOT': g_oEnv['config_win_sdk_path'] } if g_oEnv['config_win_sdk_path'] else {},
-        lambda env: { 'VBOX_PATH_WIN_SDK10_ROOT': g_oEnv['config_win_sdk10_path'] } if g_oEnv['config_win_sdk10_path'] else {},
-        # Note: Pre-defined environment variable by vcpkg. Do not change.
-        lambda env: { 'VCPKG_ROOT': g_oEnv['config_win_vcpkg_root'] } if g_oEnv['config_win_vcpkg_root'] else {},
-
-        #
-        # macOS
-        #
-        # Sets the macOS SDK path.
-        lambda env: { 'VBOX_PATH_MACOSX_SDK_ROOT': g_oEnv['config_macos_sdk_path'] } if g_oEnv['config_macos_sdk_path'] else {},
-    ];
-    g_oEnv.transform(envTransforms);
+    applyEnvTransforms(g_oEnv);
 
     if g_cVerbosity >= 2:
         printVerbose(2, 'Environment manager variables:');
@@ -2811,8 +3834,11 @@ def main():
     };
     aOsToolsToCheck = aOsTools.get( g_oEnv[ 'KBUILD_TARGET' ], [] );
     oOsToolsTable = SimpleTable([ 'Tool', 'Status', 'Version', 'Path' ]);
-    for sBinary in aOsToolsToCheck:
-        sCmdPath, sVer = checkWhich(sBinary, sBinary);
+    # These probes just wait on which/--version subprocesses, so overlap them
+    # in threads; map() keeps the table rows in list order.
+    with concurrent.futures.ThreadPoolExecutor(max_workers = max(len(aOsToolsToCheck), 1)) as oExecutor:
+        aResults = list(oExecutor.map(lambda sBinary: checkWhich(sBinary, sBinary), aOsToolsToCheck));
+    for sBinary, (sCmdPath, sVer) in zip(aOsToolsToCheck, aResults):
         oOsToolsTable.addRow(( sBinary,
                                'ok' if sCmdPath else 'failed',
                                sVer if sVer else "-",
@@ -2827,6 +3853,15 @@ def main():
         print();
         for oToolCur in aoToolsToCheck:
             oToolCur.setArgs(oArgs);
+        # Overlap the plain which/version probes in threads; tools with a
+        # callback depend on each other's g_oEnv changes and run in order.
+        fRc = runToolChecksThreaded([ oTool for oTool in aoToolsToCheck if not oTool.fnCallback ]);
+        for oToolCur in aoToolsToCheck:
+            if not oToolCur.fnCallback:
+                continue;
+            if  not fRc \
+            and not g_fContOnErr:
+                break;
             if  not oToolCur.performCheck() \
             and not g_fContOnErr:
                 break;
@@ -2839,6 +3874,18 @@ def main():
         print();
         for oLibCur in aoLibsToCheck:
             oLibCur.setArgs(oArgs);
+        queryPkgConfigVersions(aoLibsToCheck);
+        batchSyntaxCheckLibs(aoLibsToCheck);
+        # Plain library checks only read globals and mutate their own instance
+        # fields, so they can safely run in parallel worker processes. Checks
+        # with a custom callback mutate g_oEnv and stay on the sequential path.
+        fRc = runChecksParallel([ oLib for oLib in aoLibsToCheck if not oLib.fnCallback ]);
+        for oLibCur in aoLibsToCheck:
+            if not oLibCur.fnCallback:
+                continue;
+            if  not fRc \
+            and not g_fContOnErr:
+                break;
             if  not oLibCur.performCheck() \
             and not g_fContOnErr:
                 break;
@@ -2871,8 +3918,8 @@ def main():
 
     if g_cErrors == 0 \
     or g_fContOnErr:
-        if write_autoconfig_kmk(oArgs.config_file_autoconfig, g_enmHostTarget, g_oEnv, g_aoLibs, g_aoTools):
-            if write_env(oArgs.config_file_env, g_enmHostTarget, g_enmHostArch, g_oEnv, g_aoLibs, g_aoTools):
+        if write_autoconfig_kmk(oArgs.config_file_autoconfig, g_enmHostTarget, g_oEnv, getLibraryChecks(), g_aoTools):
+            if write_env(oArgs.config_file_env, g_enmHostTarget, g_enmHostArch, g_oEnv, getLibraryChecks(), g_aoTools):
                 print();
                 print(f'Successfully generated \"{oArgs.config_file_autoconfig}\" and \"{oArgs.config_file_env}\".');
                 print();
@@ -2938,6 +3985,8 @@ def main():
 
     print('\nWork in progress! Do not use for production builds yet!\n');
 
+    g_oProbeCache.flush();
+
     logf.close();
     return 0 if g_cErrors == 0 else 1;
 